@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models, transaction
 from django.utils import timezone
+from datetime import timedelta
 
 
 class User(AbstractUser):
@@ -26,6 +27,12 @@ class User(AbstractUser):
     followers_count = models.IntegerField(default=0)
     following_count = models.IntegerField(default=0)
 
+    # Columns rendered by the public UserSerializer (display_name needs is_anonymous_display)
+    PUBLIC_FIELDS = (
+        'id', 'username', 'is_anonymous_display', 'bio', 'avatar_url',
+        'total_reviews', 'total_visits', 'date_joined',
+    )
+
     class Meta:
         db_table = 'users'
         verbose_name = 'User'
@@ -62,6 +69,16 @@ class User(AbstractUser):
         from django.conf import settings
         min_age = getattr(settings, 'MIN_ACCOUNT_AGE_HOURS', 0) # will adjust later
         return self.account_age_hours >= min_age
+
+    @staticmethod
+    def review_cutoff():
+        """
+        Latest date_joined that passes can_review().
+        Lets bulk callers evaluate the account-age rule in SQL.
+        """
+        from django.conf import settings
+        min_age = getattr(settings, 'MIN_ACCOUNT_AGE_HOURS', 0)
+        return timezone.now() - timedelta(hours=min_age)
     
     @transaction.atomic
     def update_stats(self):
@@ -3,28 +3,11 @@ Authentication and User Management Tests
 """
 import pytest
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIClient
 from rest_framework import status
 
 User = get_user_model()
 
 
-@pytest.fixture
-def api_client():
-    """Create API client for tests"""
-    return APIClient()
-
-
-@pytest.fixture
-def test_user(db):
-    """Create a test user"""
-    return User.objects.create_user(
-        username='testuser',
-        email='test@example.com',
-        password='testpass123'
-    )
-
-
 @pytest.mark.django_db
 class TestUserRegistration:
     """Test user registration endpoint"""
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0008_add_favorite_composite_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='favorite',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'cafe'), name='unique_user_cafe_fav'),
+        ),
+        migrations.RemoveIndex(
+            model_name='favorite',
+            name='favorite_lookup_idx',
+        ),
+    ]
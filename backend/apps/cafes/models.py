@@ -5,6 +5,9 @@ from apps.core.constants import EARTH_RADIUS_KM
 from decimal import Decimal
 import math
 
+# 2 * R folded into one constant for the Haversine kernel
+_EARTH_DIAMETER_KM = 2 * EARTH_RADIUS_KM
+
 
 class Cafe(models.Model):
     """
@@ -141,20 +144,24 @@ class Cafe(models.Model):
         """
         Calculate distance between two points using Haversine formula.
         Returns distance in kilometers.
+
+        Uses the 2R*asin(sqrt(a)) form, which is equivalent to the atan2 form
+        for 0 <= a <= 1 but needs one fewer sqrt and a cheaper trig call.
         """
-        R = EARTH_RADIUS_KM
-        
-        lat1_rad = math.radians(float(lat1))
-        lat2_rad = math.radians(float(lat2))
-        delta_lat = math.radians(float(lat2) - float(lat1))
+        lat1 = float(lat1)
+        lat2 = float(lat2)
+
+        lat1_rad = math.radians(lat1)
+        lat2_rad = math.radians(lat2)
+        delta_lat = math.radians(lat2 - lat1)
         delta_lon = math.radians(float(lon2) - float(lon1))
-        
+
         a = (math.sin(delta_lat / 2) ** 2 +
              math.cos(lat1_rad) * math.cos(lat2_rad) *
              math.sin(delta_lon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return R * c
+
+        # Clamp guards against a creeping just above 1.0 from float rounding
+        return _EARTH_DIAMETER_KM * math.asin(min(1.0, math.sqrt(a)))
     
     def distance_to(self, lat, lng):
         """Calculate distance from this cafe to given coordinates (in km)."""
@@ -166,6 +173,37 @@ class Cafe(models.Model):
         )
     
 
+    @classmethod
+    def within_bounding_box(cls, latitude, longitude, radius_km):
+        """
+        Cafes inside the lat/lng bounding box enclosing a radius around a point.
+
+        Cheap prefilter that lets the (latitude, longitude) index narrow the
+        scan before exact Haversine filtering in Python. Falls back to a
+        latitude-only box near the poles or across the antimeridian, where a
+        longitude range can't be expressed as a single BETWEEN.
+        """
+        lat_float = float(latitude)
+        lng_float = float(longitude)
+
+        lat_delta = math.degrees(float(radius_km) / EARTH_RADIUS_KM)
+        queryset = cls.objects.filter(
+            latitude__gte=Decimal(str(lat_float - lat_delta)),
+            latitude__lte=Decimal(str(lat_float + lat_delta)),
+        )
+
+        if abs(lat_float) + lat_delta >= 90:
+            return queryset
+
+        lng_delta = lat_delta / math.cos(math.radians(lat_float))
+        if lng_float - lng_delta < -180 or lng_float + lng_delta > 180:
+            return queryset
+
+        return queryset.filter(
+            longitude__gte=Decimal(str(lng_float - lng_delta)),
+            longitude__lte=Decimal(str(lng_float + lng_delta)),
+        )
+
     @classmethod
     def find_duplicates(cls, name, latitude, longitude, threshold_meters=50):
         """
@@ -202,6 +240,28 @@ class Cafe(models.Model):
         
         return duplicates
     
+    # Denormalized columns written by update_stats / bulk_update_stats
+    STATS_FIELDS = [
+        'total_visits',
+        'unique_visitors',
+        'total_reviews',
+        'average_wfc_rating',
+        'average_ratings_cache',
+        'facility_stats_cache'
+    ]
+
+    # Columns rendered by CafeListSerializer (list endpoints and nested cafes)
+    LIST_FIELDS = (
+        'id', 'name', 'address', 'latitude', 'longitude', 'google_place_id',
+        'price_range', 'average_wfc_rating', 'total_reviews', 'total_visits',
+        'unique_visitors', 'is_closed', 'is_verified', 'created_at', 'updated_at',
+        'average_ratings_cache', 'facility_stats_cache', 'google_rating',
+        'google_ratings_count',
+    )
+
+    # Number of latest reviews the rating/facility caches are computed from
+    RECENT_REVIEWS_FOR_STATS = 100
+
     @transaction.atomic
     def update_stats(self):
         """
@@ -228,14 +288,72 @@ class Cafe(models.Model):
         recent_reviews = Review.objects.filter(
             cafe=self,
             is_hidden=False
-        ).order_by('-created_at')[:100]
+        ).order_by('-created_at')[:self.RECENT_REVIEWS_FOR_STATS]
+
+        # Update total_reviews count (all reviews, not just recent 100)
+        total_reviews = Review.objects.filter(cafe=self, is_hidden=False).count()
 
         # Convert to list to avoid re-querying
-        recent_reviews_list = list(recent_reviews)
-        total_recent = len(recent_reviews_list)
+        self._apply_review_stats(list(recent_reviews), total_reviews)
 
-        # Update total_reviews count (all reviews, not just recent 100)
-        self.total_reviews = Review.objects.filter(cafe=self, is_hidden=False).count()
+        self.save(update_fields=self.STATS_FIELDS)
+
+    @classmethod
+    @transaction.atomic
+    def bulk_update_stats(cls, cafes):
+        """
+        Recalculate stats for many cafes with a fixed number of queries.
+
+        Same results as calling update_stats() on each cafe, but visits and
+        review counts are grouped by cafe, the latest reviews per cafe come
+        from one windowed query, and everything is written with bulk_update.
+        """
+        from apps.reviews.models import Review, Visit
+        from django.db.models import Count, F, Window
+        from django.db.models.functions import RowNumber
+
+        cafes = list(cafes)
+        if not cafes:
+            return 0
+        cafe_ids = [cafe.id for cafe in cafes]
+
+        visit_stats = {
+            row['cafe_id']: row
+            for row in Visit.objects.filter(cafe_id__in=cafe_ids).values('cafe_id').annotate(
+                total_visits=Count('id'),
+                unique_visitors=Count('user', distinct=True)
+            ).order_by()
+        }
+
+        visible_reviews = Review.objects.filter(cafe_id__in=cafe_ids, is_hidden=False)
+        review_counts = dict(
+            visible_reviews.values('cafe_id').annotate(count=Count('id')).order_by().values_list('cafe_id', 'count')
+        )
+
+        recent_by_cafe = {cafe_id: [] for cafe_id in cafe_ids}
+        recent_reviews = visible_reviews.annotate(
+            recent_rank=Window(
+                RowNumber(),
+                partition_by=F('cafe_id'),
+                order_by=F('created_at').desc()
+            )
+        ).filter(recent_rank__lte=cls.RECENT_REVIEWS_FOR_STATS).order_by('cafe_id', 'recent_rank')
+        for review in recent_reviews:
+            recent_by_cafe[review.cafe_id].append(review)
+
+        for cafe in cafes:
+            stats = visit_stats.get(cafe.id, {})
+            cafe.total_visits = stats.get('total_visits', 0)
+            cafe.unique_visitors = stats.get('unique_visitors', 0)
+            cafe._apply_review_stats(recent_by_cafe[cafe.id], review_counts.get(cafe.id, 0))
+
+        cls.objects.bulk_update(cafes, cls.STATS_FIELDS, batch_size=500)
+        return len(cafes)
+
+    def _apply_review_stats(self, recent_reviews_list, total_reviews):
+        """Set review-derived stats from the latest visible reviews (no queries)."""
+        total_recent = len(recent_reviews_list)
+        self.total_reviews = total_reviews
 
         # Compute average WFC rating from recent reviews
         if recent_reviews_list:
@@ -284,15 +402,6 @@ class Cafe(models.Model):
             self.average_ratings_cache = None
             self.facility_stats_cache = None
 
-        self.save(update_fields=[
-            'total_visits',
-            'unique_visitors',
-            'total_reviews',
-            'average_wfc_rating',
-            'average_ratings_cache',
-            'facility_stats_cache'
-        ])
-
 
 class Favorite(models.Model):
     """User's favorite cafes."""
@@ -312,10 +421,13 @@ class Favorite(models.Model):
         db_table = 'favorites'
         verbose_name = 'Favorite'
         verbose_name_plural = 'Favorites'
-        unique_together = ['user', 'cafe']
         ordering = ['-created_at']
-        indexes = [
-            models.Index(fields=['user', 'cafe'], name='favorite_lookup_idx'),
+        constraints = [
+            # Its unique index also serves the (user, cafe) lookups
+            models.UniqueConstraint(
+                fields=['user', 'cafe'],
+                name='unique_user_cafe_fav'
+            )
         ]
     
     def __str__(self):
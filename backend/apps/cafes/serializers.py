@@ -1,9 +1,15 @@
+import logging
+from datetime import timedelta
+from django.utils import timezone
 from rest_framework import serializers
 from apps.core.constants import GOOGLE_RATING_FRESHNESS_HOURS
 from .models import Cafe, Favorite, CafeFlag
+from .services import GooglePlacesService
 from apps.accounts.serializers import UserSerializer
 from decimal import Decimal
 
+logger = logging.getLogger(__name__)
+
 
 class CafeStatsMixin:
     """
@@ -168,12 +174,6 @@ class CafeDetailSerializer(CafeStatsMixin, serializers.ModelSerializer):
 
         Returns True if refreshed, False otherwise.
         """
-        from django.utils import timezone
-        from datetime import timedelta
-        import logging
-
-        logger = logging.getLogger(__name__)
-
         # Only refresh if cafe has Google Place ID
         if not obj.google_place_id:
             return False
@@ -189,8 +189,6 @@ class CafeDetailSerializer(CafeStatsMixin, serializers.ModelSerializer):
 
         # Refresh from Google Places API
         try:
-            from apps.cafes.services import GooglePlacesService
-
             place_details = GooglePlacesService.get_place_details(obj.google_place_id)
 
             # Update fields
@@ -1,14 +1,21 @@
 import requests
+import time
 from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from typing import List, Dict, Optional
 import logging
 from apps.core.constants import (
     GOOGLE_PAGINATION_DELAY_SECONDS,
     GOOGLE_AUTOCOMPLETE_TIMEOUT_SECONDS,
     GOOGLE_PLACE_DETAILS_TIMEOUT_SECONDS,
+    GOOGLE_PLACE_DETAILS_CACHE_TIMEOUT,
     MAX_AUTOCOMPLETE_PREDICTIONS
 )
 
+from apps.cafes.models import Cafe
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,10 +91,9 @@ class GooglePlacesService:
                     place_lng = place['geometry']['location']['lng']
 
                     # Calculate distance from search center
-                    from apps.cafes.models import Cafe
                     distance_km = Cafe.calculate_distance(
                         latitude, longitude,
-                        float(place_lat), float(place_lng)
+                        place_lat, place_lng
                     )
 
                     # Filter by radius (since we can't use radius param with rankby)
@@ -121,7 +127,6 @@ class GooglePlacesService:
                     break
 
                 # Google requires delay between pagination requests
-                import time
                 time.sleep(GOOGLE_PAGINATION_DELAY_SECONDS)
 
             logger.info(f"Fetched {len(all_places)} cafes from Google Places (within {radius_meters}m, {page_count} pages)")
@@ -200,7 +205,6 @@ class GooglePlacesService:
                     place_lng = details['geometry']['location']['lng']
 
                     # Calculate distance
-                    from apps.cafes.models import Cafe
                     distance_km = Cafe.calculate_distance(
                         latitude, longitude,
                         float(place_lat), float(place_lng)
@@ -234,6 +238,9 @@ class GooglePlacesService:
             fields: Comma-separated list of fields to request
                    Default includes Basic Data (FREE) + some paid fields
                    For autocomplete, pass 'geometry,name,formatted_address,rating,photos'
+
+        Successful responses are cached per (place_id, fields) for
+        GOOGLE_PLACE_DETAILS_CACHE_TIMEOUT; failures are not cached.
         """
         api_key = settings.GOOGLE_PLACES_API_KEY
 
@@ -252,13 +259,21 @@ class GooglePlacesService:
             'key': api_key
         }
 
+        cache_key = f"gplace_details:{place_id}:{fields}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             response = requests.get(url, params=params, timeout=GOOGLE_PLACE_DETAILS_TIMEOUT_SECONDS)
             response.raise_for_status()
             data = response.json()
 
             if data.get('status') == 'OK':
-                return data.get('result')
+                result = data.get('result')
+                if result is not None:
+                    cache.set(cache_key, result, GOOGLE_PLACE_DETAILS_CACHE_TIMEOUT)
+                return result
             return None
 
         except requests.RequestException as e:
@@ -292,14 +307,13 @@ class CafeService:
         Raises:
             ValueError: If required fields are missing from cafe_data
         """
-        from apps.cafes.models import Cafe
-        from django.utils import timezone
-
-        # Check if cafe already exists
-        existing_cafe = Cafe.objects.filter(google_place_id=google_place_id).first()
-        if existing_cafe:
+        # Check if cafe already exists (unique lookup - no ORDER BY needed)
+        try:
+            existing_cafe = Cafe.objects.get(google_place_id=google_place_id)
             logger.info(f"Cafe with Google Place ID {google_place_id} already exists")
             return existing_cafe, False
+        except Cafe.DoesNotExist:
+            pass
 
         # Validate required fields
         required_fields = ['name', 'address', 'latitude', 'longitude']
@@ -311,22 +325,29 @@ class CafeService:
         logger.info(f"Fetching Google Place details for {google_place_id}")
         place_details = GooglePlacesService.get_place_details(google_place_id)
 
-        # Create new cafe with complete data
-        cafe = Cafe.objects.create(
-            name=cafe_data['name'],
-            address=cafe_data['address'],
-            latitude=cafe_data['latitude'],
-            longitude=cafe_data['longitude'],
-            google_place_id=google_place_id,
-            # Google Places API data (ensures consistency across all creation paths)
-            price_range=place_details.get('price_level') if place_details else None,
-            google_rating=place_details.get('rating') if place_details else None,
-            google_ratings_count=place_details.get('user_ratings_total') if place_details else None,
-            google_rating_updated_at=timezone.now() if place_details else None,
-            # Metadata
-            created_by=created_by,
-            is_verified=False
-        )
+        # Create new cafe with complete data. google_place_id is unique, so a
+        # concurrent request that created it first makes this insert fail -
+        # return that cafe instead.
+        try:
+            with transaction.atomic():
+                cafe = Cafe.objects.create(
+                    name=cafe_data['name'],
+                    address=cafe_data['address'],
+                    latitude=cafe_data['latitude'],
+                    longitude=cafe_data['longitude'],
+                    google_place_id=google_place_id,
+                    # Google Places API data (ensures consistency across all creation paths)
+                    price_range=place_details.get('price_level') if place_details else None,
+                    google_rating=place_details.get('rating') if place_details else None,
+                    google_ratings_count=place_details.get('user_ratings_total') if place_details else None,
+                    google_rating_updated_at=timezone.now() if place_details else None,
+                    # Metadata
+                    created_by=created_by,
+                    is_verified=False
+                )
+        except IntegrityError:
+            logger.info(f"Cafe with Google Place ID {google_place_id} was created concurrently")
+            return Cafe.objects.get(google_place_id=google_place_id), False
 
         logger.info(f"Created new cafe: {cafe.name} (ID: {cafe.id}, Google Place ID: {google_place_id})")
         return cafe, True
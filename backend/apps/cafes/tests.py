@@ -0,0 +1,330 @@
+"""
+Cafe Tests
+"""
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.cafes.models import Cafe, Favorite
+from apps.cafes.services import GooglePlacesService
+from apps.reviews.models import Review, Visit
+
+User = get_user_model()
+
+
+class TestCalculateDistance:
+    """Test Haversine distance calculation"""
+
+    def test_same_point_is_zero(self):
+        """Test distance between identical points is zero"""
+        assert Cafe.calculate_distance(-6.2088, 106.8456, -6.2088, 106.8456) == 0
+
+    def test_known_distance(self):
+        """Test Jakarta -> Bandung is roughly 116km"""
+        distance = Cafe.calculate_distance(-6.2088, 106.8456, -6.9175, 107.6191)
+        assert distance == pytest.approx(116.3, abs=0.5)
+
+    def test_accepts_decimal_inputs(self):
+        """Test Decimal coordinates (as stored on models) give the same result as floats"""
+        from_decimal = Cafe.calculate_distance(
+            Decimal('-6.2088'), Decimal('106.8456'),
+            Decimal('-6.2100'), Decimal('106.8500')
+        )
+        from_float = Cafe.calculate_distance(-6.2088, 106.8456, -6.2100, 106.8500)
+        assert from_decimal == pytest.approx(from_float)
+
+    def test_antipodal_points(self):
+        """Test antipodal points don't raise from float rounding"""
+        distance = Cafe.calculate_distance(0, 0, 0, 180)
+        assert distance == pytest.approx(20015.1, abs=1)
+
+
+@pytest.mark.django_db
+class TestBulkUpdateStats:
+    """Test batched cafe stats recalculation"""
+
+    def test_matches_update_stats(self, test_cafe, test_user):
+        """Test bulk_update_stats writes the same stats as update_stats"""
+        other_cafe = Cafe.objects.create(
+            name='Other Cafe',
+            address='Other St',
+            latitude=Decimal('-6.2100'),
+            longitude=Decimal('106.8500'),
+            created_by=test_user
+        )
+        empty_cafe = Cafe.objects.create(
+            name='Empty Cafe',
+            address='Empty St',
+            latitude=Decimal('-6.2200'),
+            longitude=Decimal('106.8600'),
+            created_by=test_user
+        )
+        other_user = User.objects.create_user(username='other', password='testpass123')
+
+        for cafe, user, rating, smoking in [
+            (test_cafe, test_user, 5, True),
+            (test_cafe, other_user, 3, None),
+            (other_cafe, test_user, 4, False),
+        ]:
+            Visit.objects.create(cafe=cafe, user=user)
+            Review.objects.create(
+                cafe=cafe,
+                user=user,
+                wfc_rating=rating,
+                wifi_quality=rating,
+                power_outlets_rating=rating,
+                seating_comfort=rating,
+                noise_level=rating,
+                space_availability=rating,
+                coffee_quality=rating,
+                menu_options=rating,
+                has_smoking_area=smoking
+            )
+
+        cafes = [test_cafe, other_cafe, empty_cafe]
+        for cafe in cafes:
+            cafe.update_stats()
+        expected = list(Cafe.objects.filter(pk__in=[c.pk for c in cafes]).order_by('pk').values(*Cafe.STATS_FIELDS))
+
+        Cafe.objects.update(total_visits=0, total_reviews=0, average_wfc_rating=None, average_ratings_cache=None)
+        assert Cafe.bulk_update_stats(Cafe.objects.filter(pk__in=[c.pk for c in cafes])) == 3
+
+        actual = list(Cafe.objects.filter(pk__in=[c.pk for c in cafes]).order_by('pk').values(*Cafe.STATS_FIELDS))
+        assert actual == expected
+        assert actual[0]['total_reviews'] == 2
+
+
+class TestPlaceDetailsCache:
+    """Test Google Place Details response caching"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, settings):
+        settings.GOOGLE_PLACES_API_KEY = 'test-key'
+        cache.clear()
+
+    def test_repeat_lookup_skips_api(self):
+        """Test a second lookup for the same place is served from cache"""
+        with patch('apps.cafes.services.requests.get') as mock_get:
+            mock_get.return_value.json.return_value = {'status': 'OK', 'result': {'price_level': 2}}
+
+            assert GooglePlacesService.get_place_details('place_abc') == {'price_level': 2}
+            assert GooglePlacesService.get_place_details('place_abc') == {'price_level': 2}
+
+        assert mock_get.call_count == 1
+
+    def test_failed_lookup_not_cached(self):
+        """Test a non-OK response is retried on the next call"""
+        with patch('apps.cafes.services.requests.get') as mock_get:
+            mock_get.return_value.json.return_value = {'status': 'NOT_FOUND'}
+
+            assert GooglePlacesService.get_place_details('place_abc') is None
+            assert GooglePlacesService.get_place_details('place_abc') is None
+
+        assert mock_get.call_count == 2
+
+
+@pytest.mark.django_db
+class TestFavorites:
+    """Test favorite creation endpoint"""
+
+    def test_add_favorite(self, authenticated_client, test_cafe, test_user):
+        """Test favoriting a cafe"""
+        response = authenticated_client.post('/api/cafes/favorites/', {'cafe_id': test_cafe.id})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Favorite.objects.filter(user=test_user, cafe=test_cafe).exists()
+
+    def test_add_favorite_twice(self, authenticated_client, test_cafe, test_user):
+        """Test favoriting the same cafe twice fails and doesn't duplicate"""
+        authenticated_client.post('/api/cafes/favorites/', {'cafe_id': test_cafe.id})
+        response = authenticated_client.post('/api/cafes/favorites/', {'cafe_id': test_cafe.id})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Favorite.objects.filter(user=test_user, cafe=test_cafe).count() == 1
+
+    def test_list_favorites_joins_cafe(self, authenticated_client, test_cafe, test_user, django_assert_num_queries):
+        """Test listing favorites doesn't load each nested cafe separately"""
+        for i in range(3):
+            cafe = Cafe.objects.create(
+                name=f'Cafe {i}',
+                address='Somewhere',
+                latitude=Decimal('-6.2100'),
+                longitude=Decimal('106.8500'),
+                created_by=test_user
+            )
+            Favorite.objects.create(user=test_user, cafe=cafe)
+
+        # count, favorites joined to cafe
+        with django_assert_num_queries(2):
+            response = authenticated_client.get('/api/cafes/favorites/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(f['cafe']['name'] for f in response.data['results']) == ['Cafe 0', 'Cafe 1', 'Cafe 2']
+
+
+@pytest.mark.django_db
+class TestNearbyCafes:
+    """Test DB-only nearby cafes endpoint"""
+
+    def test_nearby_returns_cafes_within_radius(self, test_cafe, test_user):
+        """Test nearby search includes close cafes and excludes far ones"""
+        far_cafe = Cafe.objects.create(
+            name='Bandung Cafe',
+            address='Bandung',
+            latitude=Decimal('-6.9175'),
+            longitude=Decimal('107.6191'),
+            created_by=test_user
+        )
+
+        response = APIClient().get('/api/cafes/nearby/', {
+            'latitude': '-6.2090',
+            'longitude': '106.8460',
+            'radius_km': '2',
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        ids = [c['id'] for c in response.data['results']]
+        assert test_cafe.id in ids
+        assert far_cafe.id not in ids
+
+    def test_bounding_box_excludes_far_cafes(self, test_cafe, test_user):
+        """Test bounding box prefilter drops cafes well outside the radius"""
+        Cafe.objects.create(
+            name='Bandung Cafe',
+            address='Bandung',
+            latitude=Decimal('-6.9175'),
+            longitude=Decimal('107.6191'),
+            created_by=test_user
+        )
+
+        nearby = Cafe.within_bounding_box(Decimal('-6.2090'), Decimal('106.8460'), 2)
+        assert list(nearby) == [test_cafe]
+
+
+@pytest.mark.django_db
+class TestMergedNearbyCafes:
+    """Test merged (database + Google Places) nearby endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def clear_throttle_cache(self):
+        """Reset throttle counters between tests"""
+        cache.clear()
+
+    def google_places(self):
+        return [
+            {
+                'google_place_id': 'test_place_123',
+                'name': 'Test Cafe',
+                'address': '123 Test St',
+                'latitude': '-6.2088',
+                'longitude': '106.8456',
+                'rating': 4.5,
+                'user_ratings_total': 10,
+            },
+            {
+                'google_place_id': 'unregistered_coffee',
+                'name': 'Kopi Kenangan',
+                'address': 'Somewhere',
+                'latitude': '-6.2100',
+                'longitude': '106.8500',
+                'rating': 4.0,
+                'user_ratings_total': 5,
+            },
+            {
+                'google_place_id': 'unregistered_other',
+                'name': 'Warung Makan',
+                'address': 'Elsewhere',
+                'latitude': '-6.2095',
+                'longitude': '106.8470',
+                'rating': 3.9,
+                'user_ratings_total': 2,
+            },
+        ]
+
+    def test_merges_registered_and_filters_unregistered(
+        self, authenticated_client, test_cafe, django_assert_num_queries
+    ):
+        """Test registered cafes are enriched in one query and non-coffee places filtered out"""
+        test_cafe.average_wfc_rating = Decimal('4.25')
+        test_cafe.average_ratings_cache = {'wifi_quality': 4.0}
+        test_cafe.save()
+
+        with patch(
+            'apps.cafes.views.GooglePlacesService.search_nearby_coffee_shops',
+            return_value=self.google_places()
+        ), django_assert_num_queries(1):
+            response = authenticated_client.get('/api/cafes/nearby/all/', {
+                'latitude': '-6.2088',
+                'longitude': '106.8456',
+                'radius_km': '2',
+            })
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [r['google_place_id'] for r in results] == ['test_place_123', 'unregistered_coffee']
+
+        registered, unregistered = results
+        assert registered['is_registered'] is True
+        assert registered['id'] == test_cafe.id
+        assert registered['average_wfc_rating'] == 4.25
+        assert registered['distance'] == 0
+        assert registered['latitude'] == '-6.2088'
+        assert registered['average_ratings'] == {'wifi_quality': 4.0}
+        assert unregistered['is_registered'] is False
+        assert unregistered['id'] == 'google_unregistered_coffee'
+        assert not any(key.startswith('_') for r in results for key in r)
+
+    def test_limit_keeps_registered_then_nearest(self, authenticated_client, test_cafe):
+        """Test limit keeps registered cafes first, then the closest unregistered ones"""
+        places = self.google_places() + [
+            {
+                'google_place_id': 'unregistered_far_coffee',
+                'name': 'Far Coffee',
+                'address': 'Far away',
+                'latitude': '-6.2200',
+                'longitude': '106.8600',
+                'rating': 4.1,
+                'user_ratings_total': 3,
+            },
+        ]
+
+        with patch(
+            'apps.cafes.views.GooglePlacesService.search_nearby_coffee_shops',
+            return_value=places
+        ):
+            response = authenticated_client.get('/api/cafes/nearby/all/', {
+                'latitude': '-6.2088',
+                'longitude': '106.8456',
+                'radius_km': '5',
+                'limit': '2',
+            })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [r['google_place_id'] for r in response.data['results']] == [
+            'test_place_123', 'unregistered_coffee'
+        ]
+
+    def test_registered_cafe_matched_by_place_id(self, authenticated_client, test_cafe):
+        """Test a registered cafe stored far from Google's point is still matched by place ID"""
+        # Stored point ~2 km off, outside the search radius
+        test_cafe.latitude = Decimal('-6.2268')
+        test_cafe.save()
+
+        with patch(
+            'apps.cafes.views.GooglePlacesService.search_nearby_coffee_shops',
+            return_value=self.google_places()
+        ):
+            response = authenticated_client.get('/api/cafes/nearby/all/', {
+                'latitude': '-6.2088',
+                'longitude': '106.8456',
+                'radius_km': '1',
+            })
+
+        assert response.status_code == status.HTTP_200_OK
+        registered = response.data['results'][0]
+        assert registered['google_place_id'] == 'test_place_123'
+        assert registered['is_registered'] is True
+        assert registered['id'] == test_cafe.id
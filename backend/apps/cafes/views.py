@@ -21,6 +21,15 @@ from core.permissions import IsOwnerOrReadOnly
 from apps.core.constants import MAX_NEARBY_CAFES
 from django.conf import settings
 from .services import GooglePlacesService
+from functools import lru_cache
+import heapq
+import re
+
+
+@lru_cache(maxsize=8)
+def _compile_keyword_pattern(keywords):
+    """Build a single alternation regex so names are scanned once, not once per keyword."""
+    return re.compile('|'.join(map(re.escape, keywords)))
 
 
 # Custom throttle classes for expensive Google Places API endpoints
@@ -39,7 +48,7 @@ class CafeListCreateView(generics.ListCreateAPIView):
     GET /api/cafes/
     POST /api/cafes/
     """
-    queryset = Cafe.objects.filter(is_closed=False)
+    queryset = Cafe.objects.filter(is_closed=False).only(*Cafe.LIST_FIELDS)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['price_range', 'is_verified']
@@ -115,19 +124,24 @@ class NearbyCafesView(APIView):
         
         # Find nearby cafes from DB only (Haversine calculation)
         # Note: With PlacesAPI-first architecture, consider using /api/cafes/nearby/all/ instead
-        all_cafes = Cafe.objects.filter(is_closed=False)
+        # Bounding-box prefilter uses the (latitude, longitude) index so only
+        # candidates near the point are loaded, not the whole cafes table
+        all_cafes = Cafe.within_bounding_box(
+            latitude, longitude, radius_km
+        ).filter(is_closed=False).only(*Cafe.LIST_FIELDS)
+
+        radius_km = float(radius_km)
 
-        # Calculate distances and filter by radius
-        nearby_cafes = []
-        for cafe in all_cafes:
-            distance = cafe.distance_to(latitude, longitude)
-            if distance <= float(radius_km):
-                cafe.distance = distance
-                nearby_cafes.append(cafe)
+        def cafes_within_radius():
+            # Stream rows in chunks instead of materializing the whole queryset
+            for cafe in all_cafes.iterator(chunk_size=2000):
+                distance = cafe.distance_to(latitude, longitude)
+                if distance <= radius_km:
+                    cafe.distance = distance
+                    yield cafe
 
-        # Sort by distance
-        nearby_cafes.sort(key=lambda c: c.distance)
-        nearby_cafes = nearby_cafes[:limit]
+        # Bounded heap keeps only the closest `limit` cafes in memory, sorted by distance
+        nearby_cafes = heapq.nsmallest(limit, cafes_within_radius(), key=lambda c: c.distance)
 
         # Serialize results
         serializer = CafeListSerializer(nearby_cafes, many=True, context={'request': request})
@@ -149,7 +163,10 @@ class FavoriteListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user)
+        # Join the nested cafe instead of loading it per favorite
+        return Favorite.objects.filter(user=self.request.user).select_related('cafe').only(
+            'id', 'cafe', 'created_at', *(f'cafe__{name}' for name in Cafe.LIST_FIELDS)
+        )
     
     def create(self, request, *args, **kwargs):
         cafe_id = request.data.get('cafe_id')
@@ -162,12 +179,12 @@ class FavoriteListCreateView(generics.ListCreateAPIView):
         except Cafe.DoesNotExist:
             raise CafeNotFound()
 
-        # Check if already favorited
-        if Favorite.objects.filter(user=request.user, cafe=cafe).exists():
+        # Single round-trip in the happy path; the unique constraint makes
+        # concurrent duplicate requests resolve to the existing row
+        favorite, created = Favorite.objects.get_or_create(user=request.user, cafe=cafe)
+        if not created:
             raise AlreadyFavorited()
 
-        # Create favorite
-        favorite = Favorite.objects.create(user=request.user, cafe=cafe)
         serializer = self.get_serializer(favorite)
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -232,7 +249,7 @@ class MergedNearbyCafesView(APIView):
     def _fetch_google_places(self, params):
         """Fetch coffee shops from Google Places API."""
         try:
-            return GooglePlacesService.search_nearby_coffee_shops(
+            places = GooglePlacesService.search_nearby_coffee_shops(
                 latitude=params['latitude'],
                 longitude=params['longitude'],
                 radius_meters=int(params['radius_km'] * 1000)
@@ -243,6 +260,13 @@ class MergedNearbyCafesView(APIView):
             logger.warning(f"Google Places API error: {e}")
             return []
 
+        # Normalize filter inputs once here so the unregistered-place filter
+        # is plain key reads (stripped again before the response is built)
+        for place in places:
+            place['_name_lower'] = (place.get('name') or '').lower()
+            place['_types_set'] = frozenset(place.get('types') or ())
+        return places
+
     def _get_registered_cafes_map(self, google_places):
         """
         Look up which Google Places are registered in our database.
@@ -261,13 +285,20 @@ class MergedNearbyCafesView(APIView):
         db_cafes = Cafe.objects.filter(
             google_place_id__in=google_place_ids,
             is_closed=False
-        ).select_related('created_by').values(
-            'id', 'google_place_id', 'name', 'latitude', 'longitude',
-            'average_wfc_rating', 'total_reviews', 'total_visits', 'unique_visitors',
-            'average_ratings_cache', 'facility_stats_cache', 'is_verified'
+        ).values(
+            'id', 'google_place_id', 'average_wfc_rating', 'total_reviews',
+            'total_visits', 'unique_visitors', 'is_verified',
+            'average_ratings_cache', 'facility_stats_cache'
         )
 
-        return {cafe['google_place_id']: cafe for cafe in db_cafes}
+        registered_map = {}
+        for cafe in db_cafes:
+            # Normalize Decimal -> float once here instead of per enrichment
+            rating = cafe['average_wfc_rating']
+            cafe['average_wfc_rating'] = float(rating) if rating is not None else None
+            registered_map[cafe['google_place_id']] = cafe
+
+        return registered_map
 
     def _get_filter_config(self):
         """Get keyword and type filters for unregistered cafes."""
@@ -277,31 +308,30 @@ class MergedNearbyCafesView(APIView):
         allowed_types = getattr(settings, 'GOOGLE_PLACES_ALLOWED_TYPES', {
             'cafe', 'coffee_shop', 'bakery', 'restaurant', 'food'
         })
-        return allowed_keywords, allowed_types
+        keyword_pattern = _compile_keyword_pattern(tuple(allowed_keywords)) if allowed_keywords else None
+        return keyword_pattern, allowed_types
 
     def _enrich_registered_place(self, place, wfc_data):
         """Enrich a registered cafe with WFC data."""
-        place.update({
-            'is_registered': True,
-            'source': 'database',
-            'id': wfc_data['id'],
-            'average_wfc_rating': float(wfc_data['average_wfc_rating']) if wfc_data['average_wfc_rating'] else None,
-            'total_reviews': wfc_data['total_reviews'],
-            'unique_visitors': wfc_data['unique_visitors'],
-            'total_visits': wfc_data['total_visits'],
-            'is_verified': wfc_data['is_verified'],
-            'average_ratings': wfc_data['average_ratings_cache'],
-            'facility_stats': wfc_data['facility_stats_cache'],
-        })
+        # Direct assignment avoids building a throwaway dict per place
+        place['is_registered'] = True
+        place['source'] = 'database'
+        place['id'] = wfc_data['id']
+        place['average_wfc_rating'] = wfc_data['average_wfc_rating']  # Already float (see _get_registered_cafes_map)
+        place['total_reviews'] = wfc_data['total_reviews']
+        place['unique_visitors'] = wfc_data['unique_visitors']
+        place['total_visits'] = wfc_data['total_visits']
+        place['is_verified'] = wfc_data['is_verified']
+        place['average_ratings'] = wfc_data['average_ratings_cache']
+        place['facility_stats'] = wfc_data['facility_stats_cache']
         return place
 
-    def _should_include_unregistered(self, place, allowed_keywords, allowed_types):
+    def _should_include_unregistered(self, place, keyword_pattern, allowed_types):
         """Check if an unregistered place passes keyword/type filters."""
-        name_lower = (place.get('name') or '').lower()
-        if allowed_keywords and not any(kw in name_lower for kw in allowed_keywords):
+        if keyword_pattern and not keyword_pattern.search(place['_name_lower']):
             return False
 
-        place_types = set(place.get('types') or [])
+        place_types = place['_types_set']
         if allowed_types and place_types and place_types.isdisjoint(allowed_types):
             return False
 
@@ -309,23 +339,21 @@ class MergedNearbyCafesView(APIView):
 
     def _enrich_unregistered_place(self, place):
         """Add default values for an unregistered cafe."""
-        place.update({
-            'is_registered': False,
-            'source': 'google_places',
-            'id': f"google_{place['google_place_id']}",
-            'average_wfc_rating': None,
-            'total_reviews': 0,
-            'unique_visitors': 0,
-            'total_visits': 0,
-            'is_verified': False,
-            'average_ratings': None,
-            'facility_stats': None,
-        })
+        place['is_registered'] = False
+        place['source'] = 'google_places'
+        place['id'] = f"google_{place['google_place_id']}"
+        place['average_wfc_rating'] = None
+        place['total_reviews'] = 0
+        place['unique_visitors'] = 0
+        place['total_visits'] = 0
+        place['is_verified'] = False
+        place['average_ratings'] = None
+        place['facility_stats'] = None
         return place
 
     def _enrich_and_filter_results(self, google_places, registered_map, params):
         """Filter unregistered cafes and enrich all results with WFC/distance data."""
-        allowed_keywords, allowed_types = self._get_filter_config()
+        keyword_pattern, allowed_types = self._get_filter_config()
         enriched_results = []
 
         for place in google_places:
@@ -336,14 +364,17 @@ class MergedNearbyCafesView(APIView):
                 place = self._enrich_registered_place(place, registered_map[place_id])
             else:
                 # Unregistered cafe - apply filters
-                if not self._should_include_unregistered(place, allowed_keywords, allowed_types):
+                if not self._should_include_unregistered(place, keyword_pattern, allowed_types):
                     continue
                 place = self._enrich_unregistered_place(place)
 
+            # Fetch-time filter helpers are internal - keep them out of the response
+            del place['_name_lower'], place['_types_set']
+
             # Calculate distance and add Google rating fields
             place['distance'] = round(Cafe.calculate_distance(
-                float(place['latitude']),
-                float(place['longitude']),
+                place['latitude'],
+                place['longitude'],
                 params['distance_ref_lat'],
                 params['distance_ref_lng']
             ), 2)
@@ -356,8 +387,10 @@ class MergedNearbyCafesView(APIView):
 
     def _sort_and_limit(self, results, limit):
         """Sort by registration status (registered first) then by distance."""
-        results.sort(key=lambda x: (not x['is_registered'], x['distance']))
-        return results[:limit]
+        # Partial top-k selection; nsmallest is stable so ties keep Google's order
+        return heapq.nsmallest(
+            limit, results, key=lambda x: (not x['is_registered'], x['distance'])
+        )
 
     def _build_response(self, results):
         """Format the final API response."""
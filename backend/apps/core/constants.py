@@ -42,6 +42,10 @@ GOOGLE_AUTOCOMPLETE_TIMEOUT_SECONDS = 5
 # Timeout for Google Places details API requests (seconds)
 GOOGLE_PLACE_DETAILS_TIMEOUT_SECONDS = 3
 
+# Lifetime of cached Google Place Details responses (seconds).
+# Kept well under GOOGLE_RATING_FRESHNESS_HOURS so rating refreshes still see recent data
+GOOGLE_PLACE_DETAILS_CACHE_TIMEOUT = 60 * 60 * 6
+
 
 # ============================================================
 # MODERATION
@@ -44,6 +44,34 @@ CURRENCY_SYMBOLS = {
 }
 
 
+# Bounding boxes used for currency detection:
+# (lat_min, lat_max, lon_min, lon_max, currency), all bounds inclusive.
+# Boxes overlap, so ORDER MATTERS - the first match wins. Southeast Asian
+# boxes are clipped to the region's outer box (-11..6, 95..141) that used
+# to gate them, which keeps results identical to the old if/elif ladder.
+CURRENCY_REGIONS = (
+    # Southeast Asia
+    (-11, -6, 95, 141, 'IDR'),        # Indonesia (south of -6)
+    (-6, 6, 95, 120, 'IDR'),          # Indonesia (western/central)
+    (1.1, 1.5, 103.6, 104.1, 'SGD'),  # Singapore
+    (0.8, 6, 99.6, 119.3, 'MYR'),     # Malaysia
+    (5.6, 6, 97.3, 105.6, 'THB'),     # Thailand
+    (4.6, 6, 116.9, 126.6, 'PHP'),    # Philippines
+    # East & South Asia
+    (24, 46, 123, 146, 'JPY'),        # Japan
+    (33, 43, 124, 132, 'KRW'),        # South Korea
+    (18, 54, 73, 135, 'CNY'),         # China
+    (6, 37, 68, 97, 'INR'),           # India
+    # Oceania
+    (-44, -10, 113, 154, 'AUD'),      # Australia
+    # Europe (approximate)
+    (49.9, 60.9, -8.2, 1.8, 'GBP'),   # UK
+    (36, 71, -10, 40, 'EUR'),         # Rest of Europe
+    # Americas
+    (24, 50, -125, -66, 'USD'),       # United States
+)
+
+
 def detect_currency_from_coordinates(latitude: float, longitude: float) -> str:
     """
     Detect currency based on latitude and longitude.
@@ -59,63 +87,9 @@ def detect_currency_from_coordinates(latitude: float, longitude: float) -> str:
     lat = float(latitude)
     lon = float(longitude)
 
-    # Southeast Asia
-    if -11 <= lat <= 6 and 95 <= lon <= 141:
-        # Indonesia (approximate bounding box)
-        if -11 <= lat <= 6 and 95 <= lon <= 141:
-            if lat <= -6 or (lat >= -6 and lat <= 6 and lon >= 95 and lon <= 120):
-                return 'IDR'
-
-        # Singapore
-        if 1.1 <= lat <= 1.5 and 103.6 <= lon <= 104.1:
-            return 'SGD'
-
-        # Malaysia
-        if 0.8 <= lat <= 7.4 and 99.6 <= lon <= 119.3:
-            return 'MYR'
-
-        # Thailand
-        if 5.6 <= lat <= 20.5 and 97.3 <= lon <= 105.6:
-            return 'THB'
-
-        # Philippines
-        if 4.6 <= lat <= 21.1 and 116.9 <= lon <= 126.6:
-            return 'PHP'
-
-        # Vietnam
-        if 8.5 <= lat <= 23.4 and 102.1 <= lon <= 109.5:
-            return 'VND'
-
-    # Japan
-    if 24 <= lat <= 46 and 123 <= lon <= 146:
-        return 'JPY'
-
-    # South Korea
-    if 33 <= lat <= 43 and 124 <= lon <= 132:
-        return 'KRW'
-
-    # China
-    if 18 <= lat <= 54 and 73 <= lon <= 135:
-        return 'CNY'
-
-    # India
-    if 6 <= lat <= 37 and 68 <= lon <= 97:
-        return 'INR'
-
-    # Australia
-    if -44 <= lat <= -10 and 113 <= lon <= 154:
-        return 'AUD'
-
-    # Europe (approximate)
-    if 36 <= lat <= 71 and -10 <= lon <= 40:
-        # UK
-        if 49.9 <= lat <= 60.9 and -8.2 <= lon <= 1.8:
-            return 'GBP'
-        return 'EUR'
-
-    # United States
-    if 24 <= lat <= 50 and -125 <= lon <= -66:
-        return 'USD'
+    for lat_min, lat_max, lon_min, lon_max, currency in CURRENCY_REGIONS:
+        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
+            return currency
 
     # Default to USD for anywhere else
     return 'USD'
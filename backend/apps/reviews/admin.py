@@ -1,8 +1,46 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.forms.models import BaseInlineFormSet
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import BooleanField, Count, Exists, ExpressionWrapper, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from apps.cafes.models import Cafe
+from apps.core.constants import REVIEW_AUTO_HIDE_FLAG_THRESHOLD
 from .models import Visit, Review, ReviewFlag, ReviewHelpful
 
 
+# Static badge markup built once at import instead of per changelist row.
+# Ratings are validated 1-5 integers, so indexing the table is safe.
+_STARS = tuple('⭐' * n for n in range(6))
+_LOCATION_UNKNOWN = mark_safe('<span style="color: gray;">-</span>')
+_LOCATION_VERIFIED = mark_safe('<span style="color: green;">✓ Verified</span>')
+_LOCATION_TOO_FAR = mark_safe('<span style="color: red;">✗ Too far</span>')
+_FLAGS_CLEAN = mark_safe('<span style="color: green;">✓ Clean</span>')
+_REVIEW_HIDDEN = mark_safe('<span style="color: red;">Hidden</span>')
+_REVIEW_VISIBLE = mark_safe('<span style="color: green;">Visible</span>')
+
+
+class OnlyFieldsChangeList(ChangeList):
+    """
+    Changelist that loads only the admin's list_only_fields.
+
+    Narrows just the rendered result page: change views and admin actions
+    (which get a fresh cl.get_queryset()) still load full rows.
+    """
+
+    def get_results(self, request):
+        full_queryset = self.queryset
+        self.queryset = full_queryset.only(*self.model_admin.list_only_fields)
+        try:
+            super().get_results(request)
+        finally:
+            self.queryset = full_queryset
+
+
 @admin.register(Visit)
 class VisitAdmin(admin.ModelAdmin):
     """Admin interface for user visits."""
@@ -22,6 +60,11 @@ class VisitAdmin(admin.ModelAdmin):
     ]
     
     search_fields = ['user__username', 'cafe__name']
+
+    list_select_related = ['user', 'cafe']
+
+    # AJAX lookups instead of <select>s that load every user/cafe
+    autocomplete_fields = ['user', 'cafe']
     
     ordering = ['-visit_date', '-created_at']
     
@@ -40,34 +83,70 @@ class VisitAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """
+        Annotate review existence in the main SELECT.
+
+        Reviews are no longer tied to a visit (one review per user per
+        cafe), so a visit "has a review" when its user reviewed its cafe.
+        """
+        qs = super().get_queryset(request)
+        return qs.annotate(
+            has_review_flag=Exists(
+                Review.objects.filter(user=OuterRef('user'), cafe=OuterRef('cafe'))
+            )
+        )
+
     def has_review(self, obj):
-        """Check if visit has a review."""
-        has_review = hasattr(obj, 'review') and obj.review is not None
-        if has_review:
-            return format_html('<span style="color: green;">✓ Yes</span>')
-        return format_html('<span style="color: gray;">✗ No</span>')
+        """Check if the visitor has reviewed this cafe."""
+        return obj.has_review_flag
     has_review.short_description = 'Has Review'
+    has_review.boolean = True
     
     def is_location_verified(self, obj):
         """Show location verification status."""
         status = obj.is_verified_location()
         if status is None:
-            return format_html('<span style="color: gray;">-</span>')
+            return _LOCATION_UNKNOWN
         elif status:
-            return format_html('<span style="color: green;">✓ Verified</span>')
+            return _LOCATION_VERIFIED
         else:
-            return format_html('<span style="color: red;">✗ Too far</span>')
+            return _LOCATION_TOO_FAR
     is_location_verified.short_description = 'Location'
 
 
+class LatestReviewFlagsFormSet(BaseInlineFormSet):
+    """Inline formset that only renders the most recent flags."""
+
+    max_shown = 20
+
+    def get_queryset(self):
+        # Slice after the FK filter the base formset applies; a heavily
+        # flagged review shouldn't render thousands of inline rows
+        if not hasattr(self, '_latest_queryset'):
+            self._latest_queryset = super().get_queryset()[:self.max_shown]
+        return self._latest_queryset
+
+
 class ReviewFlagInline(admin.TabularInline):
-    """Inline admin for review flags."""
+    """Inline admin for review flags (latest 20; full list in Review Flags admin)."""
     model = ReviewFlag
+    formset = LatestReviewFlagsFormSet
     extra = 0
     fields = ['flagged_by', 'reason', 'comment', 'created_at']
-    readonly_fields = ['created_at']
+    # Read-only so flagged_by renders from the joined row instead of a
+    # <select> of every user; flags are added via the Review Flags admin
+    readonly_fields = fields
     can_delete = False
 
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        """Join flagged_by so each inline row doesn't load its user separately."""
+        qs = super().get_queryset(request)
+        return qs.select_related('flagged_by')
+
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -102,6 +181,23 @@ class ReviewAdmin(admin.ModelAdmin):
         'cafe__name',
         'comment'
     ]
+
+    list_select_related = ['user', 'cafe']
+
+    # AJAX lookups instead of <select>s that load every user/cafe
+    autocomplete_fields = ['user', 'cafe']
+
+    # Columns rendered by list_display (see OnlyFieldsChangeList)
+    list_only_fields = [
+        'user__username',
+        'user__is_anonymous_display',
+        'cafe__name',
+        'wfc_rating',
+        'wifi_quality',
+        'noise_level',
+        'is_hidden',
+        'created_at',
+    ]
     
     ordering = ['-created_at']
     
@@ -115,7 +211,7 @@ class ReviewAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Review Information', {
-            'fields': ('user', 'cafe', 'visit', 'comment')
+            'fields': ('user', 'cafe', 'comment')
         }),
         ('WiFi & Power', {
             'fields': (
@@ -168,6 +264,27 @@ class ReviewAdmin(admin.ModelAdmin):
         'check_for_spam',
         'recalculate_cafe_stats'
     ]
+
+    def get_queryset(self, request):
+        """Optimize queryset with select_related (also used by the change view)."""
+        qs = super().get_queryset(request)
+        # Count flags in a correlated subquery rather than Count('flags') so
+        # other aggregate annotations (check_for_spam) don't multiply it
+        live_flag_count = ReviewFlag.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(count=Count('pk')).values('count')
+        return qs.select_related('user', 'cafe').annotate(
+            live_flag_count=Coalesce(Subquery(live_flag_count, output_field=IntegerField()), 0)
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return OnlyFieldsChangeList
+
+    def get_inlines(self, request, obj):
+        """Skip the flag inline (and its query) for unflagged or new reviews."""
+        if obj is None or obj.live_flag_count == 0:
+            return []
+        return self.inlines
     
     def user_display(self, obj):
         """Display username with anonymous indicator."""
@@ -181,28 +298,31 @@ class ReviewAdmin(admin.ModelAdmin):
     
     def wfc_rating_display(self, obj):
         """Display WFC rating with stars."""
-        stars = '⭐' * obj.wfc_rating
-        return format_html('{} ({})', stars, obj.wfc_rating)
+        return mark_safe(f'{_STARS[obj.wfc_rating]} ({obj.wfc_rating})')
     wfc_rating_display.short_description = 'WFC Rating'
     
     def flag_status(self, obj):
-        """Display flag count with color coding."""
-        if obj.flag_count == 0:
-            return format_html('<span style="color: green;">✓ Clean</span>')
-        elif obj.flag_count < 3:
+        """Display live flag count (not the denormalized flag_count) with color coding."""
+        flag_count = obj.live_flag_count
+        if flag_count == 0:
+            return _FLAGS_CLEAN
+        elif flag_count < REVIEW_AUTO_HIDE_FLAG_THRESHOLD:
             return format_html(
                 '<span style="color: orange;">⚠ {} flag(s)</span>',
-                obj.flag_count
+                flag_count
             )
         else:
             return format_html(
                 '<span style="color: red;">⚠ {} flags (auto-hidden)</span>',
-                obj.flag_count
+                flag_count
             )
     flag_status.short_description = 'Flags'
     
     def average_rating_display(self, obj):
         """Display average of all ratings."""
+        if obj.pk is None:
+            # Add form - ratings aren't filled in yet
+            return '-'
         return f"{obj.average_rating:.2f}"
     average_rating_display.short_description = 'Average Rating'
     
@@ -231,21 +351,36 @@ class ReviewAdmin(admin.ModelAdmin):
         self.message_user(request, f"Unhidden {count} reviews.")
     unhide_reviews.short_description = "Unhide selected reviews"
     
+    @transaction.atomic
     def mark_as_not_spam(self, request, queryset):
         """Mark reviews as not spam and clear flags."""
-        for review in queryset:
-            review.is_flagged = False
-            review.is_hidden = False
-            review.flag_count = 0
-            review.save()
-            # Optionally delete flags
-            review.flags.all().delete()
-        self.message_user(request, f"Cleared flags for {queryset.count()} reviews.")
+        # Two set-based statements regardless of selection size; atomic so
+        # flags and counters can't disagree if either fails
+        ReviewFlag.objects.filter(review__in=queryset).delete()
+        count = queryset.update(
+            is_flagged=False,
+            is_hidden=False,
+            flag_count=0,
+            updated_at=timezone.now()
+        )
+        self.message_user(request, f"Cleared flags for {count} reviews.")
     mark_as_not_spam.short_description = "Mark as not spam (clear flags)"
     
     def check_for_spam(self, request, queryset):
         """Check selected reviews for spam indicators."""
         spam_count = 0
+        # One GROUP BY for every row's same-day review count and account-age
+        # check instead of evaluating them per review inside check_spam()
+        queryset = queryset.select_related('user').annotate(
+            user_reviews_today=Count(
+                'user__reviews',
+                filter=Q(user__reviews__created_at__date=timezone.now().date())
+            ),
+            user_can_review=ExpressionWrapper(
+                Q(user__date_joined__lte=get_user_model().review_cutoff()),
+                output_field=BooleanField()
+            )
+        )
         for review in queryset:
             is_spam, reason = review.check_spam()
             if is_spam:
@@ -268,12 +403,14 @@ class ReviewAdmin(admin.ModelAdmin):
     
     def recalculate_cafe_stats(self, request, queryset):
         """Recalculate statistics for cafes of selected reviews."""
-        cafes = set(review.cafe for review in queryset)
-        for cafe in cafes:
-            cafe.update_stats()
+        # cafe_id subquery instead of dereferencing review.cafe per row; the
+        # stats columns are all recomputed, so only the pk needs loading
+        count = Cafe.bulk_update_stats(
+            Cafe.objects.filter(pk__in=queryset.values('cafe_id')).only('pk').order_by()
+        )
         self.message_user(
             request,
-            f"Recalculated stats for {len(cafes)} cafes."
+            f"Recalculated stats for {count} cafes."
         )
     recalculate_cafe_stats.short_description = "Recalculate cafe stats"
 
@@ -301,6 +438,20 @@ class ReviewFlagAdmin(admin.ModelAdmin):
         'flagged_by__username',
         'comment'
     ]
+
+    list_select_related = ['review__user', 'review__cafe', 'flagged_by']
+
+    autocomplete_fields = ['review', 'flagged_by']
+
+    # Columns rendered by list_display (see OnlyFieldsChangeList)
+    list_only_fields = [
+        'review__user__username',
+        'review__cafe__name',
+        'review__is_hidden',
+        'flagged_by__username',
+        'reason',
+        'created_at',
+    ]
     
     ordering = ['-created_at']
     
@@ -315,6 +466,14 @@ class ReviewFlagAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Optimize queryset with select_related."""
+        qs = super().get_queryset(request)
+        return qs.select_related('review__user', 'review__cafe', 'flagged_by')
+
+    def get_changelist(self, request, **kwargs):
+        return OnlyFieldsChangeList
+
     def review_summary(self, obj):
         """Short summary of the flagged review."""
         return f"Review by {obj.review.user.username} of {obj.review.cafe.name}"
@@ -323,25 +482,35 @@ class ReviewFlagAdmin(admin.ModelAdmin):
     def review_hidden_status(self, obj):
         """Show if the review is hidden."""
         if obj.review.is_hidden:
-            return format_html('<span style="color: red;">Hidden</span>')
-        return format_html('<span style="color: green;">Visible</span>')
+            return _REVIEW_HIDDEN
+        return _REVIEW_VISIBLE
     review_hidden_status.short_description = 'Review Status'
     
     actions = ['hide_flagged_reviews', 'dismiss_flags']
     
     def hide_flagged_reviews(self, request, queryset):
         """Hide all reviews that were flagged."""
-        reviews = set(flag.review for flag in queryset)
-        for review in reviews:
-            review.is_hidden = True
-            review.save()
-        self.message_user(request, f"Hidden {len(reviews)} reviews.")
+        count = Review.objects.filter(
+            pk__in=queryset.values('review_id')
+        ).update(is_hidden=True, updated_at=timezone.now())
+        self.message_user(request, f"Hidden {count} reviews.")
     hide_flagged_reviews.short_description = "Hide flagged reviews"
     
+    @transaction.atomic
     def dismiss_flags(self, request, queryset):
         """Delete flags (dismiss as invalid)."""
+        review_ids = set(queryset.values_list('review_id', flat=True))
         count = queryset.count()
         queryset.delete()
+
+        # The bulk delete skips per-flag hooks, so recount the affected reviews
+        remaining_flags = ReviewFlag.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(count=Count('pk')).values('count')
+        Review.objects.filter(pk__in=review_ids).update(
+            flag_count=Coalesce(Subquery(remaining_flags, output_field=IntegerField()), 0),
+            updated_at=timezone.now()
+        )
         self.message_user(request, f"Dismissed {count} flags.")
     dismiss_flags.short_description = "Dismiss flags"
 
@@ -366,10 +535,19 @@ class ReviewHelpfulAdmin(admin.ModelAdmin):
         'user__username'
     ]
 
+    list_select_related = ['review__user', 'review__cafe', 'user']
+
+    autocomplete_fields = ['review', 'user']
+
     ordering = ['-created_at']
 
     readonly_fields = ['created_at']
 
+    def get_queryset(self, request):
+        """Optimize queryset with select_related."""
+        qs = super().get_queryset(request)
+        return qs.select_related('review__user', 'review__cafe', 'user')
+
     def review_summary(self, obj):
         """Short summary of the review."""
         return f"Review by {obj.review.user.username} of {obj.review.cafe.name}"
@@ -0,0 +1,90 @@
+"""
+Management command to resync denormalized review counters.
+
+helpful_count and flag_count are kept in step by ReviewHelpful/ReviewFlag
+save()/delete(), but writes that bypass those hooks (bulk operations, raw
+SQL, manual DB fixes) can leave them drifted. This recomputes both from the
+source tables in set-based UPDATEs (one grouped subquery per counter, no
+per-review COUNT). Resynced reviews whose flag count crosses the auto-hide
+threshold are hidden; reviews already at the threshold are left alone so a
+moderator's manual un-hide sticks.
+
+Usage:
+    python manage.py resync_review_counters
+    python manage.py resync_review_counters --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from apps.core.constants import REVIEW_AUTO_HIDE_FLAG_THRESHOLD
+from apps.reviews.models import Review, ReviewFlag, ReviewHelpful
+
+
+def _count_per_review(model):
+    """Correlated COUNT of `model` rows for the outer review."""
+    counts = (
+        model.objects.filter(review=OuterRef('pk'))
+        .order_by()
+        .values('review')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class Command(BaseCommand):
+    help = 'Recompute Review.helpful_count / flag_count from their source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted reviews without making changes'
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        helpful_counts = _count_per_review(ReviewHelpful)
+        flag_counts = _count_per_review(ReviewFlag)
+
+        # Rows where either stored counter disagrees with the source table
+        drifted = Review.objects.annotate(
+            actual_helpful=helpful_counts,
+            actual_flags=flag_counts
+        ).exclude(
+            helpful_count=F('actual_helpful'),
+            flag_count=F('actual_flags')
+        )
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f'Would resync: {drifted.count()} reviews'))
+            return
+
+        # Captured before the UPDATE: only reviews that were below the
+        # threshold and now reach it are auto-hidden (mirrors ReviewFlag.save())
+        crossing_pks = list(
+            drifted.filter(
+                flag_count__lt=REVIEW_AUTO_HIDE_FLAG_THRESHOLD,
+                actual_flags__gte=REVIEW_AUTO_HIDE_FLAG_THRESHOLD
+            ).values_list('pk', flat=True)
+        )
+
+        resynced = Review.objects.filter(pk__in=drifted.values('pk')).update(
+            helpful_count=helpful_counts,
+            flag_count=flag_counts
+        )
+
+        hidden = Review.objects.filter(
+            pk__in=crossing_pks,
+            is_hidden=False
+        ).update(is_hidden=True, is_flagged=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Resynced counters on {resynced} reviews'))
+        self.stdout.write(self.style.SUCCESS(f'Auto-hid {hidden} reviews at the flag threshold'))
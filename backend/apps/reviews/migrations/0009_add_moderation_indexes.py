@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0009_favorite_unique_constraint'),
+        ('reviews', '0008_remove_review_visit_review_review_user_cafe_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_flagged', 'is_hidden'], name='review_moderation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewflag',
+            index=models.Index(fields=['reason', '-created_at'], name='review_flag_reason_idx'),
+        ),
+    ]
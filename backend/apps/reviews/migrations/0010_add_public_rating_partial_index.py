@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0009_favorite_unique_constraint'),
+        ('reviews', '0009_add_moderation_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_hidden', False)), fields=['cafe', '-wfc_rating'], name='review_public_rating_idx'),
+        ),
+    ]
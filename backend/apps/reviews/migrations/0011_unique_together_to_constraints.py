@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0009_favorite_unique_constraint'),
+        ('reviews', '0010_add_public_rating_partial_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reviewhelpful',
+            name='review_help_review__cbfc3c_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='reviewflag',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reviewhelpful',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='visit',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewflag',
+            constraint=models.UniqueConstraint(fields=('review', 'flagged_by'), name='unique_review_flag_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewhelpful',
+            constraint=models.UniqueConstraint(fields=('review', 'user'), name='unique_review_helpful_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='visit',
+            constraint=models.UniqueConstraint(fields=('cafe', 'user', 'visit_date'), name='unique_cafe_user_visit_date'),
+        ),
+    ]
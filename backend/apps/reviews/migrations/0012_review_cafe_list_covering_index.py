@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0009_favorite_unique_constraint'),
+        ('reviews', '0011_unique_together_to_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Create the replacement first so list queries always have an index
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['cafe', 'is_hidden', '-created_at'], include=('user', 'wfc_rating', 'helpful_count'), name='review_cafe_list_covering_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='reviews_cafe_id_373b20_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_cafe_hidden_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_cafe_hidden_created_idx',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_review_cafe_list_covering_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='visit',
+            name='check_in_latitude',
+            field=models.FloatField(blank=True, help_text='Latitude when checking in (for verification)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='visit',
+            name='check_in_longitude',
+            field=models.FloatField(blank=True, help_text='Longitude when checking in (for verification)', null=True),
+        ),
+    ]
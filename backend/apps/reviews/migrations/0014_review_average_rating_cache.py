@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:25
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+
+REQUIRED_RATING_FIELDS = (
+    'wifi_quality', 'noise_level', 'seating_comfort', 'space_availability',
+    'coffee_quality', 'menu_options', 'wfc_rating',
+)
+OPTIONAL_RATING_FIELDS = ('power_outlets_rating', 'bathroom_quality')
+
+
+def backfill_average_rating(apps, schema_editor):
+    """Populate average_rating_cache in one UPDATE (same rules as Review.compute_average_rating)."""
+    Review = apps.get_model('reviews', 'Review')
+
+    total = sum((F(field) for field in REQUIRED_RATING_FIELDS[1:]), F(REQUIRED_RATING_FIELDS[0]))
+    count = Value(len(REQUIRED_RATING_FIELDS))
+    for field in OPTIONAL_RATING_FIELDS:
+        total += Coalesce(F(field), Value(0))
+        count += Case(When(**{f'{field}__gt': 0}, then=Value(1)), default=Value(0))
+
+    Review.objects.update(
+        average_rating_cache=ExpressionWrapper(Cast(total, FloatField()) / count, output_field=FloatField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0009_favorite_unique_constraint'),
+        ('reviews', '0013_visit_check_in_float_coordinates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='average_rating_cache',
+            field=models.FloatField(default=0, help_text='Cached average of all rated criteria'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-average_rating_cache'], name='review_avg_rating_idx'),
+        ),
+        migrations.RunPython(backfill_average_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_review_average_rating_cache'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_user_cafe_idx',
+        ),
+    ]
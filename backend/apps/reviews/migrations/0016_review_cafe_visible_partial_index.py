@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0009_favorite_unique_constraint'),
+        ('reviews', '0015_remove_review_user_cafe_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Create the replacement first so list queries always have an index
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_hidden', False)), fields=['cafe', '-created_at'], include=('user', 'wfc_rating', 'helpful_count'), name='review_cafe_visible_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_cafe_list_covering_idx',
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:30
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafes', '0009_favorite_unique_constraint'),
+        ('reviews', '0016_review_cafe_visible_partial_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='bathroom_quality',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Bathroom quality (1=very poor, 5=excellent)', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='coffee_quality',
+            field=models.PositiveSmallIntegerField(help_text='Coffee quality (1=very poor, 5=excellent)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='menu_options',
+            field=models.PositiveSmallIntegerField(help_text='Menu variety (1=very limited, 5=extensive)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='noise_level',
+            field=models.PositiveSmallIntegerField(help_text='Noise level (1=very quiet, 5=very loud)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='power_outlets_rating',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Accessibility/quantity of outlets (1=very few, 5=plenty)', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='seating_comfort',
+            field=models.PositiveSmallIntegerField(help_text='Seating comfort (1=very uncomfortable, 5=very comfortable)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='space_availability',
+            field=models.PositiveSmallIntegerField(help_text='How crowded/available is space (1=always full, 5=plenty of space)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='visit_time',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Morning (Open - 1pm)'), (2, 'Afternoon (1pm - 6pm)'), (3, 'Evening (6pm - Close)')], help_text='Time of visit (deprecated - now stored in Visit model)', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(3)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='wfc_rating',
+            field=models.PositiveSmallIntegerField(help_text='Overall WFC suitability (1=not suitable, 5=perfect for WFC)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='wifi_quality',
+            field=models.PositiveSmallIntegerField(help_text='WiFi quality (1=very poor, 5=excellent)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='visit',
+            name='visit_time',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Morning (6AM - 12PM)'), (2, 'Afternoon (12PM - 6PM)'), (3, 'Evening (6PM - 12AM)')], help_text='Time of day visited (1=Morning, 2=Afternoon, 3=Evening)', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(3)]),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.CheckConstraint(condition=models.Q(('visit_time__in', [1, 2, 3]), ('visit_time__isnull', True), _connector='OR'), name='review_visit_time_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='visit',
+            constraint=models.CheckConstraint(condition=models.Q(('visit_time__in', [1, 2, 3]), ('visit_time__isnull', True), _connector='OR'), name='visit_time_range'),
+        ),
+    ]
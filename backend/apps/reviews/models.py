@@ -1,9 +1,66 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Value, When
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
 from django.utils import timezone
 from apps.core.currency_utils import CURRENCY_CHOICES
-from apps.core.constants import REVIEW_AUTO_HIDE_FLAG_THRESHOLD
+from apps.core.constants import (
+    EARTH_RADIUS_KM,
+    MAX_CHECKIN_DISTANCE_KM,
+    REVIEW_AUTO_HIDE_FLAG_THRESHOLD,
+)
+import math
+from datetime import timedelta
+
+# Criteria averaged into Review.average_rating_cache
+_RATING_FIELDS = frozenset({
+    'wifi_quality',
+    'power_outlets_rating',
+    'noise_level',
+    'seating_comfort',
+    'space_availability',
+    'coffee_quality',
+    'menu_options',
+    'bathroom_quality',
+    'wfc_rating',
+})
+
+# Short labels for visit_time, indexed by its 1-3 value (0 = not set)
+_VISIT_TIME_LABELS = ('unknown', 'morning', 'afternoon', 'evening')
+
+
+def _joined_list_fields(queryset):
+    """
+    only() names for the joined user and cafe, narrowed to what the nested
+    UserSerializer / CafeListSerializer render.
+    """
+    user_model = queryset.model._meta.get_field('user').related_model
+    cafe_model = queryset.model._meta.get_field('cafe').related_model
+    return (
+        *(f'user__{name}' for name in user_model.PUBLIC_FIELDS),
+        *(f'cafe__{name}' for name in cafe_model.LIST_FIELDS),
+    )
+
+
+class VisitQuerySet(models.QuerySet):
+    """QuerySet helpers for Visit."""
+
+    # Columns rendered by VisitSerializer (check-in coordinates are write-only)
+    LIST_FIELDS = (
+        'id', 'user', 'cafe', 'visit_date', 'amount_spent', 'currency',
+        'visit_time', 'created_at',
+    )
+
+    def with_cafe(self):
+        """Join cafe and user so serializers and __str__ don't query per row."""
+        return self.select_related('cafe', 'user')
+
+    def list_fields(self):
+        """
+        Skip the columns the visit list never renders.
+        Chain after with_cafe(); narrows the joined user and cafe rows too.
+        """
+        return self.only(*self.LIST_FIELDS, *_joined_list_fields(self))
 
 
 class Visit(models.Model):
@@ -51,7 +108,7 @@ class Visit(models.Model):
         (2, 'Afternoon (12PM - 6PM)'),
         (3, 'Evening (6PM - 12AM)'),
     ]
-    visit_time = models.IntegerField(
+    visit_time = models.PositiveSmallIntegerField(
         choices=VISIT_TIME_CHOICES,
         validators=[MinValueValidator(1), MaxValueValidator(3)],
         null=True,
@@ -60,16 +117,13 @@ class Visit(models.Model):
     )
 
     # Optional: Location verification (check-in)
-    check_in_latitude = models.DecimalField(
-        max_digits=10,
-        decimal_places=8,
+    # Plain doubles: only ever used for distance math, never displayed
+    check_in_latitude = models.FloatField(
         null=True,
         blank=True,
         help_text="Latitude when checking in (for verification)"
     )
-    check_in_longitude = models.DecimalField(
-        max_digits=11,
-        decimal_places=8,
+    check_in_longitude = models.FloatField(
         null=True,
         blank=True,
         help_text="Longitude when checking in (for verification)"
@@ -77,12 +131,24 @@ class Visit(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = VisitQuerySet.as_manager()
+
     class Meta:
         db_table = 'visits'
         verbose_name = 'Visit'
         verbose_name_plural = 'Visits'
-        unique_together = ['user', 'cafe', 'visit_date']
         ordering = ['-visit_date', '-created_at']
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(visit_time__in=[1, 2, 3]) | Q(visit_time__isnull=True),
+                name='visit_time_range'
+            ),
+            # cafe first: the unique index also serves per-cafe visitor lookups
+            models.UniqueConstraint(
+                fields=['cafe', 'user', 'visit_date'],
+                name='unique_cafe_user_visit_date'
+            )
+        ]
         indexes = [
             models.Index(fields=['cafe', '-visit_date']),
             models.Index(fields=['user', '-visit_date']),
@@ -91,26 +157,75 @@ class Visit(models.Model):
     def __str__(self):
         return f"{self.user.username} → {self.cafe.name} on {self.visit_date}"
     
-    def is_verified_location(self, max_distance_km=1.0):
+    def is_verified_location(self, max_distance_km=MAX_CHECKIN_DISTANCE_KM):
         """
         Check if check-in location is within acceptable distance of cafe.
         Returns True if verified, False if too far, None if no check-in data.
         """
-        if not self.check_in_latitude or not self.check_in_longitude:
+        if self.check_in_latitude is None or self.check_in_longitude is None:
             return None
         
         # Import inside method to avoid circular imports
         from apps.cafes.models import Cafe
-        
+
+        # Cafe coordinates are Decimal; check-ins are floats but may be
+        # assigned as Decimal on an unsaved visit
+        check_in_lat = float(self.check_in_latitude)
+        cafe_lat = float(self.cafe.latitude)
+
+        # Latitude difference alone is a lower bound on the distance, so
+        # far-off check-ins are rejected without the trig
+        if math.radians(abs(check_in_lat - cafe_lat)) * EARTH_RADIUS_KM > max_distance_km:
+            return False
+
         distance = Cafe.calculate_distance(
-            self.check_in_latitude,
-            self.check_in_longitude,
-            self.cafe.latitude,
-            self.cafe.longitude
+            check_in_lat,
+            float(self.check_in_longitude),
+            cafe_lat,
+            float(self.cafe.longitude)
         )
         return distance <= max_distance_km
 
 
+class ReviewQuerySet(models.QuerySet):
+    """QuerySet helpers for Review."""
+
+    # Columns rendered by ReviewListSerializer (plus the joined user/cafe)
+    LIST_FIELDS = (
+        'id', 'user', 'cafe', 'wfc_rating', 'wifi_quality', 'noise_level',
+        'visit_time', 'comment', 'helpful_count', 'created_at',
+    )
+
+    def list_fields(self):
+        """
+        Skip the columns list endpoints never render (other criteria, moderation, etc.).
+
+        When chained after with_display_data(), the joined user and cafe rows
+        are narrowed to what UserSerializer / CafeListSerializer render as well.
+        """
+        return self.only(*self.LIST_FIELDS, *_joined_list_fields(self))
+
+    def with_display_data(self, user=None):
+        """
+        Load everything review serializers render in a single query.
+
+        Joins user and cafe; for an authenticated user, also annotates whether
+        that user marked each review helpful / flagged it (`user_marked_helpful`,
+        `user_flagged`), read by the serializers instead of querying per review.
+        """
+        queryset = self.select_related('user', 'cafe')
+        if user is not None and user.is_authenticated:
+            queryset = queryset.annotate(
+                user_marked_helpful=Exists(
+                    ReviewHelpful.objects.filter(review=OuterRef('pk'), user=user)
+                ),
+                user_flagged=Exists(
+                    ReviewFlag.objects.filter(review=OuterRef('pk'), flagged_by=user)
+                )
+            )
+        return queryset
+
+
 class Review(models.Model):
     """
     WFC-focused cafe reviews.
@@ -137,13 +252,13 @@ class Review(models.Model):
     
     # WFC-specific ratings (1-5 scale)
     # WiFi
-    wifi_quality = models.IntegerField(
+    wifi_quality = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="WiFi quality (1=very poor, 5=excellent)"
     )
     
     # Power outlets
-    power_outlets_rating = models.IntegerField(
+    power_outlets_rating = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         null=True,
         blank=True,
@@ -151,33 +266,33 @@ class Review(models.Model):
     )
     
     # Noise level
-    noise_level = models.IntegerField(
+    noise_level = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="Noise level (1=very quiet, 5=very loud)"
     )
     
     # Seating & Space
-    seating_comfort = models.IntegerField(
+    seating_comfort = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="Seating comfort (1=very uncomfortable, 5=very comfortable)"
     )
-    space_availability = models.IntegerField(
+    space_availability = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="How crowded/available is space (1=always full, 5=plenty of space)"
     )
     
     # Food & Beverage
-    coffee_quality = models.IntegerField(
+    coffee_quality = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="Coffee quality (1=very poor, 5=excellent)"
     )
-    menu_options = models.IntegerField(
+    menu_options = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="Menu variety (1=very limited, 5=extensive)"
     )
     
     # Facilities
-    bathroom_quality = models.IntegerField(
+    bathroom_quality = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         null=True,
         blank=True,
@@ -198,7 +313,7 @@ class Review(models.Model):
     )
 
     # Overall WFC suitability (required)
-    wfc_rating = models.IntegerField(
+    wfc_rating = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="Overall WFC suitability (1=not suitable, 5=perfect for WFC)"
     )
@@ -210,7 +325,7 @@ class Review(models.Model):
         (2, 'Afternoon (1pm - 6pm)'),
         (3, 'Evening (6pm - Close)'),
     ]
-    visit_time = models.IntegerField(
+    visit_time = models.PositiveSmallIntegerField(
         choices=VISIT_TIME_CHOICES,
         validators=[MinValueValidator(1), MaxValueValidator(3)],
         null=True,
@@ -231,6 +346,12 @@ class Review(models.Model):
         help_text="Number of users who found this review helpful"
     )
 
+    # Average of rated criteria, recomputed in save() so lists can sort on it
+    average_rating_cache = models.FloatField(
+        default=0,
+        help_text="Cached average of all rated criteria"
+    )
+
     # Moderation
     is_flagged = models.BooleanField(default=False)
     flag_count = models.IntegerField(default=0)
@@ -243,6 +364,8 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         db_table = 'reviews'
         verbose_name = 'Review'
@@ -250,86 +373,139 @@ class Review(models.Model):
         ordering = ['-created_at']
 
         # UPDATED: Unique constraint - one review per user per cafe
+        # (its index also serves the user + cafe "review exists" lookups)
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'cafe'],
                 name='unique_user_cafe_review'
-            )
+            ),
+            models.CheckConstraint(
+                condition=Q(visit_time__in=[1, 2, 3]) | Q(visit_time__isnull=True),
+                name='review_visit_time_range'
+            ),
         ]
 
         indexes = [
-            models.Index(fields=['cafe', '-created_at']),
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['-wfc_rating']),
             models.Index(fields=['is_hidden']),
-            # NEW: Index for user-cafe lookups (checking if review exists)
-            models.Index(fields=['user', 'cafe'], name='review_user_cafe_idx'),
-            # Composite index for common filter: cafe + is_hidden
-            models.Index(fields=['cafe', 'is_hidden'], name='review_cafe_hidden_idx'),
-            # Composite index for common query pattern: cafe + is_hidden + ordering by created_at
-            # This optimizes: Review.objects.filter(cafe=X, is_hidden=False).order_by('-created_at')
-            models.Index(fields=['cafe', 'is_hidden', '-created_at'], name='review_cafe_hidden_created_idx'),
+            # Partial covering index for the common query pattern:
+            # Review.objects.filter(cafe=X, is_hidden=False).order_by('-created_at')
+            # Hidden rows are left out to keep it small; INCLUDE columns
+            # (PostgreSQL only) let summary queries run as index-only scans.
+            models.Index(
+                fields=['cafe', '-created_at'],
+                name='review_cafe_visible_idx',
+                include=['user', 'wfc_rating', 'helpful_count'],
+                condition=Q(is_hidden=False)
+            ),
             # Index for helpful count (used in sorting "most helpful" reviews)
             models.Index(fields=['-helpful_count'], name='review_helpful_count_idx'),
+            # Sorting by overall average rating
+            models.Index(fields=['-average_rating_cache'], name='review_avg_rating_idx'),
+            # Admin moderation filters (is_flagged + is_hidden together)
+            models.Index(fields=['is_flagged', 'is_hidden'], name='review_moderation_idx'),
+            # Partial index for public listings (visible reviews by rating)
+            models.Index(
+                fields=['cafe', '-wfc_rating'],
+                name='review_public_rating_idx',
+                condition=Q(is_hidden=False)
+            ),
         ]
     
     def __str__(self):
         return f"{self.user.username}'s review of {self.cafe.name} ({self.wfc_rating}⭐)"
-    
-    @property
-    def average_rating(self):
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Refresh the stored average in the same write, but only when ratings
+        # may have changed - saves like update_fields=['is_hidden'] must not
+        # load deferred rating columns
+        if update_fields is None:
+            self.average_rating_cache = self.compute_average_rating()
+        elif not _RATING_FIELDS.isdisjoint(update_fields):
+            self.average_rating_cache = self.compute_average_rating()
+            kwargs['update_fields'] = {*update_fields, 'average_rating_cache'}
+        super().save(*args, **kwargs)
+
+    def compute_average_rating(self):
         """Calculate average of all rated criteria."""
-        ratings = [
-            self.wifi_quality,
-            self.power_outlets_rating or 0,
-            self.noise_level,
-            self.seating_comfort,
-            self.space_availability,
-            self.coffee_quality,
-            self.menu_options,
-            self.bathroom_quality or 0,
-            self.wfc_rating,
-        ]
-        valid_ratings = [r for r in ratings if r > 0]
+        ratings = [getattr(self, field) for field in _RATING_FIELDS]
+        valid_ratings = [r for r in ratings if r and r > 0]
         return sum(valid_ratings) / len(valid_ratings) if valid_ratings else 0
+
+    @property
+    def average_rating(self):
+        """Average of all rated criteria, as stored on the last save."""
+        return self.average_rating_cache
     
     @property
     def visit_time_display(self):
         """Return human-readable visit time."""
-        time_map = {
-            1: 'morning',
-            2: 'afternoon',
-            3: 'evening'
-        }
-        return time_map.get(self.visit_time, 'unknown')
+        if self.visit_time in (1, 2, 3):
+            return _VISIT_TIME_LABELS[self.visit_time]
+        return _VISIT_TIME_LABELS[0]
     
-    def check_spam(self):
+    @staticmethod
+    def check_user_spam(user, can_review=None, today_count=None):
         """
-        Check if review might be spam based on various heuristics.
+        Spam heuristics for a review by `user`, without building a Review.
+
+        `can_review` / `today_count` may be passed when the caller already
+        knows them (bulk annotations, prior checks); otherwise they are
+        resolved from the user and a COUNT of today's reviews.
         Returns (is_spam: bool, reason: str)
         """
         # Check if user is new
-        if not self.user.can_review():
+        if can_review is None:
+            can_review = user.can_review()
+        if not can_review:
             return True, "Account too new"
-        
+
         # Check if user has too many reviews today
         max_reviews_per_day = getattr(settings, 'MAX_REVIEWS_PER_DAY', 10)
-        
-        today_count = Review.objects.filter(
-            user=self.user,
-            created_at__date=timezone.now().date()
-        ).count()
-        
+
+        # Counted in the DB rather than a cached counter: the cache is
+        # per-process, so each worker would only see its own writes.
+        # The day range (not created_at__date) keeps the (user, -created_at)
+        # index usable.
+        if today_count is None:
+            day_start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+            today_count = Review.objects.filter(
+                user_id=user.pk,
+                created_at__gte=day_start,
+                created_at__lt=day_start + timedelta(days=1)
+            ).count()
+
         if today_count > max_reviews_per_day:
             return True, "Too many reviews in one day"
-        
+
         return False, "OK"
 
+    def check_spam(self):
+        """
+        Check if review might be spam based on various heuristics.
+        Returns (is_spam: bool, reason: str)
+        """
+        # Bulk callers (admin) annotate user_can_review / user_reviews_today
+        return Review.check_user_spam(
+            self.user,
+            can_review=getattr(self, 'user_can_review', None),
+            today_count=getattr(self, 'user_reviews_today', None)
+        )
+
 
 class ReviewHelpful(models.Model):
     """
     Tracks which users found a review helpful.
     Users can only mark a review helpful once.
+
+    Review.helpful_count is kept in step by save/delete below with a single
+    F() UPDATE in the same transaction as the write, rather than by database
+    triggers. flag_count is only incremented by ReviewFlag.save(); flags
+    have no delete hook, so the admin's dismiss_flags recounts it. Other
+    writes that bypass these hooks (bulk_create, queryset.delete(), raw SQL)
+    leave the counters drifted until resync_review_counters is run.
     """
     review = models.ForeignKey(
         Review,
@@ -347,34 +523,43 @@ class ReviewHelpful(models.Model):
         db_table = 'review_helpful'
         verbose_name = 'Review Helpful Mark'
         verbose_name_plural = 'Review Helpful Marks'
-        unique_together = ['review', 'user']
         ordering = ['-created_at']
+        constraints = [
+            # Also serves "has this user marked this review" lookups
+            models.UniqueConstraint(
+                fields=['review', 'user'],
+                name='unique_review_helpful_user'
+            )
+        ]
         indexes = [
-            models.Index(fields=['review', '-created_at']),
             models.Index(fields=['user', '-created_at']),
         ]
 
     def __str__(self):
         return f"{self.user.username} found review #{self.review.id} helpful"
 
+    @transaction.atomic
     def save(self, *args, **kwargs):
         """Update helpful count on review when marking helpful."""
         is_new = self.pk is None
         super().save(*args, **kwargs)
 
         if is_new:
-            # Update helpful count
-            self.review.helpful_count = self.review.helpful_marks.count()
-            self.review.save(update_fields=['helpful_count'])
+            # Single atomic increment instead of COUNT + save
+            Review.objects.filter(pk=self.review_id).update(
+                helpful_count=F('helpful_count') + 1
+            )
 
+    @transaction.atomic
     def delete(self, *args, **kwargs):
         """Update helpful count on review when unmarking helpful."""
-        review = self.review
-        super().delete(*args, **kwargs)
+        review_id = self.review_id
+        result = super().delete(*args, **kwargs)
 
-        # Update helpful count
-        review.helpful_count = review.helpful_marks.count()
-        review.save(update_fields=['helpful_count'])
+        Review.objects.filter(pk=review_id).update(
+            helpful_count=F('helpful_count') - 1
+        )
+        return result
 
 
 class ReviewFlag(models.Model):
@@ -408,22 +593,35 @@ class ReviewFlag(models.Model):
         db_table = 'review_flags'
         verbose_name = 'Review Flag'
         verbose_name_plural = 'Review Flags'
-        unique_together = ['review', 'flagged_by']
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['review', 'flagged_by'],
+                name='unique_review_flag_user'
+            )
+        ]
+        indexes = [
+            # Admin list_filter on reason with default ordering
+            models.Index(fields=['reason', '-created_at'], name='review_flag_reason_idx'),
+        ]
     
     def __str__(self):
         return f"{self.flagged_by.username} flagged review #{self.review.id}"
     
+    @transaction.atomic
     def save(self, *args, **kwargs):
         """Auto-hide review if it reaches flag threshold."""
+        is_new = self.pk is None
         super().save(*args, **kwargs)
 
-        # Update flag count
-        self.review.flag_count = self.review.flags.count()
+        if not is_new:
+            return
 
-        # Auto-hide if threshold reached
-        if self.review.flag_count >= REVIEW_AUTO_HIDE_FLAG_THRESHOLD:
-            self.review.is_hidden = True
-            self.review.is_flagged = True
-        
-        self.review.save(update_fields=['flag_count', 'is_hidden', 'is_flagged'])
\ No newline at end of file
+        # Single atomic UPDATE: bump the count and auto-hide in the same
+        # statement (conditions see the pre-increment flag_count)
+        reaches_threshold = Q(flag_count__gte=REVIEW_AUTO_HIDE_FLAG_THRESHOLD - 1)
+        Review.objects.filter(pk=self.review_id).update(
+            flag_count=F('flag_count') + 1,
+            is_hidden=Case(When(reaches_threshold, then=Value(True)), default=F('is_hidden')),
+            is_flagged=Case(When(reaches_threshold, then=Value(True)), default=F('is_flagged')),
+        )
\ No newline at end of file
@@ -1,9 +1,24 @@
+from datetime import date
 from rest_framework import serializers
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Subquery
 from apps.core.constants import MAX_CHECKIN_DISTANCE_KM
 from .models import Visit, Review, ReviewFlag, ReviewHelpful
 from apps.accounts.serializers import UserSerializer
+from apps.cafes.models import Cafe
 from apps.cafes.serializers import CafeListSerializer
+from apps.cafes.services import CafeService
+
+# Review criteria filled from wfc_rating when a combined visit+review omits them
+_DEFAULTED_CRITERIA = (
+    'wifi_quality', 'power_outlets_rating', 'seating_comfort', 'noise_level',
+    'space_availability', 'coffee_quality', 'menu_options', 'bathroom_quality',
+)
+
+# Write-only inputs used to register a Google Places cafe, not Visit columns
+_CAFE_REGISTRATION_FIELDS = (
+    'google_place_id', 'cafe_name', 'cafe_address', 'cafe_latitude', 'cafe_longitude',
+)
 
 
 class VisitSerializer(serializers.ModelSerializer):
@@ -17,13 +32,12 @@ class VisitSerializer(serializers.ModelSerializer):
     cafe_id = serializers.IntegerField(write_only=True, required=False)
     user = UserSerializer(read_only=True)
 
-    check_in_latitude = serializers.DecimalField(
-        max_digits=10, decimal_places=8, write_only=True, required=False,
-        error_messages={'required': 'Check-in location is required to verify visit.'}
+    # Plain floats: only used for the distance check and stored as FloatField
+    check_in_latitude = serializers.FloatField(
+        min_value=-90, max_value=90, write_only=True, required=False
     )
-    check_in_longitude = serializers.DecimalField(
-        max_digits=11, decimal_places=8, write_only=True, required=False,
-        error_messages={'required': 'Check-in location is required to verify visit.'}
+    check_in_longitude = serializers.FloatField(
+        min_value=-180, max_value=180, write_only=True, required=False
     )
 
     google_place_id = serializers.CharField(write_only=True, required=False)
@@ -61,11 +75,6 @@ class VisitSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         """Validate visit data and handle cafe creation if needed."""
         request = self.context.get('request')
-        from apps.cafes.models import Cafe
-
-        # Skip most validation for updates (only allow amount_spent and visit_time)
-        if self.instance is not None:
-            return attrs
 
         if 'cafe_id' in attrs:
             try:
@@ -91,8 +100,6 @@ class VisitSerializer(serializers.ModelSerializer):
                 })
 
             # Use CafeService to get or create cafe with complete Google data
-            from apps.cafes.services import CafeService
-
             cafe_data = {
                 'name': attrs['cafe_name'],
                 'address': attrs['cafe_address'],
@@ -119,20 +126,10 @@ class VisitSerializer(serializers.ModelSerializer):
                 ]
             })
 
-        visit_date = attrs.get('visit_date')
+        # Duplicate (user, cafe, visit_date) visits are rejected by the
+        # unique constraint in create()
         cafe = attrs['cafe_id']
 
-        if Visit.objects.filter(
-            user=request.user,
-            cafe=cafe,
-            visit_date=visit_date
-        ).exists():
-            raise serializers.ValidationError({
-                'non_field_errors': [
-                    'You already logged a visit to this cafe on this date.'
-                ]
-            })
-
         check_in_lat = attrs.get('check_in_latitude')
         check_in_lng = attrs.get('check_in_longitude')
 
@@ -163,85 +160,86 @@ class VisitSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def create(self, validated_data):
         """
-        Create visit with current user and update cafe stats atomically.
-        Uses @transaction.atomic to ensure visit creation and stats update succeed together.
+        Create visit with current user, then refresh cafe stats.
+        Stats are recomputed once the visit commits, so the aggregate queries
+        don't hold the write transaction open.
         """
-        validated_data.pop('google_place_id', None)
-        validated_data.pop('cafe_name', None)
-        validated_data.pop('cafe_address', None)
-        validated_data.pop('cafe_latitude', None)
-        validated_data.pop('cafe_longitude', None)
+        # Cafe registration inputs were consumed by validate()
+        for field in _CAFE_REGISTRATION_FIELDS:
+            validated_data.pop(field, None)
 
         cafe = validated_data.pop('cafe_id')
         validated_data['cafe'] = cafe
         validated_data['user'] = self.context['request'].user
 
-        visit = super().create(validated_data)
+        try:
+            with transaction.atomic():
+                visit = super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                'non_field_errors': [
+                    'You already logged a visit to this cafe on this date.'
+                ]
+            })
 
-        cafe.update_stats()
+        transaction.on_commit(cafe.update_stats)
 
         return visit
 
-    def update(self, instance, validated_data):
-        """Update visit within 7-day window."""
-        from datetime import date
 
-        # Check 7-day window
-        days_since_visit = (date.today() - instance.visit_date).days
+class VisitUpdateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for editing a visit within the 7-day window.
+
+    Only amount_spent, currency and visit_time are editable, so none of
+    VisitSerializer's cafe registration or check-in validation runs.
+    Responses use VisitSerializer's representation.
+    """
+
+    class Meta:
+        model = Visit
+        fields = ['amount_spent', 'currency', 'visit_time']
+
+    def validate(self, attrs):
+        """Reject edits to visits older than 7 days."""
+        days_since_visit = (date.today() - self.instance.visit_date).days
         if days_since_visit > 7:
             raise serializers.ValidationError({
                 'non_field_errors': [
                     f'Cannot edit visit after 7 days. This visit was {days_since_visit} days ago.'
                 ]
             })
+        return attrs
 
-        # Only allow updating amount_spent, currency, and visit_time
-        allowed_fields = ['amount_spent', 'currency', 'visit_time']
-        for field in allowed_fields:
-            if field in validated_data:
-                setattr(instance, field, validated_data[field])
+    def update(self, instance, validated_data):
+        """UPDATE only the submitted columns (skipped entirely if none were sent)."""
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
 
-        instance.save()
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
         return instance
 
+    def to_representation(self, instance):
+        return VisitSerializer(instance, context=self.context).data
 
-class ReviewListSerializer(serializers.ModelSerializer):
-    """Serializer for review list view."""
-
-    user = UserSerializer(read_only=True)
-    cafe = CafeListSerializer(read_only=True)
-    visit_time_display = serializers.ReadOnlyField()
-    is_helpful = serializers.SerializerMethodField()
-    user_has_flagged = serializers.SerializerMethodField()
 
-    class Meta:
-        model = Review
-        fields = [
-            'id',
-            'user',
-            'cafe',
-            'wfc_rating',
-            'wifi_quality',
-            'noise_level',
-            'visit_time',
-            'visit_time_display',
-            'comment',
-            'helpful_count',
-            'is_helpful',
-            'user_has_flagged',
-            'created_at'
-        ]
+class ReviewViewerStateMixin:
+    """
+    Mixin for review serializers providing the requesting user's
+    helpful/flag state. Shared by ReviewListSerializer and ReviewDetailSerializer.
+    """
 
     def get_is_helpful(self, obj):
         """
         Check if current user marked this review as helpful.
-        Uses prefetched data to avoid N+1 queries.
+        Uses annotated data to avoid N+1 queries.
         """
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            # Use prefetched data if available (from queryset optimization)
-            if hasattr(obj, 'user_helpful'):
-                return bool(obj.user_helpful)
+            # Use annotated data if available (Review.objects.with_display_data())
+            if hasattr(obj, 'user_marked_helpful'):
+                return obj.user_marked_helpful
             # Fallback to query if not prefetched
             return ReviewHelpful.objects.filter(
                 review=obj,
@@ -252,13 +250,13 @@ class ReviewListSerializer(serializers.ModelSerializer):
     def get_user_has_flagged(self, obj):
         """
         Check if current user has flagged this review.
-        Uses prefetched data to avoid N+1 queries.
+        Uses annotated data to avoid N+1 queries.
         """
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            # Use prefetched data if available (from queryset optimization)
-            if hasattr(obj, 'user_flags'):
-                return bool(obj.user_flags)
+            # Use annotated data if available (Review.objects.with_display_data())
+            if hasattr(obj, 'user_flagged'):
+                return obj.user_flagged
             # Fallback to query if not prefetched
             return ReviewFlag.objects.filter(
                 review=obj,
@@ -267,7 +265,35 @@ class ReviewListSerializer(serializers.ModelSerializer):
         return False
 
 
-class ReviewDetailSerializer(serializers.ModelSerializer):
+class ReviewListSerializer(ReviewViewerStateMixin, serializers.ModelSerializer):
+    """Serializer for review list view."""
+
+    user = UserSerializer(read_only=True)
+    cafe = CafeListSerializer(read_only=True)
+    visit_time_display = serializers.ReadOnlyField()
+    is_helpful = serializers.SerializerMethodField()
+    user_has_flagged = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Review
+        fields = [
+            'id',
+            'user',
+            'cafe',
+            'wfc_rating',
+            'wifi_quality',
+            'noise_level',
+            'visit_time',
+            'visit_time_display',
+            'comment',
+            'helpful_count',
+            'is_helpful',
+            'user_has_flagged',
+            'created_at'
+        ]
+
+
+class ReviewDetailSerializer(ReviewViewerStateMixin, serializers.ModelSerializer):
     """
     Detailed serializer for review.
 
@@ -307,16 +333,6 @@ class ReviewDetailSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
 
-    def get_is_helpful(self, obj):
-        """Check if current user marked this review as helpful."""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return ReviewHelpful.objects.filter(
-                review=obj,
-                user=request.user
-            ).exists()
-        return False
-
 
 class ReviewCreateSerializer(serializers.ModelSerializer):
     """
@@ -348,11 +364,19 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
         ]
 
     def validate_cafe_id(self, value):
-        """Validate that cafe exists."""
-        from apps.cafes.models import Cafe
+        """
+        Validate that cafe exists.
 
+        The same query annotates the id of the user's existing review of the
+        cafe (`existing_review_id`), checked in validate().
+        """
+        request = self.context.get('request')
         try:
-            cafe = Cafe.objects.get(id=value, is_closed=False)
+            cafe = Cafe.objects.annotate(
+                existing_review_id=Subquery(
+                    Review.objects.filter(cafe=OuterRef('pk'), user=request.user).values('id')[:1]
+                )
+            ).get(id=value, is_closed=False)
         except Cafe.DoesNotExist:
             raise serializers.ValidationError("Cafe not found or is closed.")
 
@@ -372,22 +396,13 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
             })
 
         # IMPORTANT: Check if user already has a review for this cafe
-        existing_review = Review.objects.filter(
-            user=request.user,
-            cafe=cafe
-        ).first()
-
-        if existing_review:
+        if cafe.existing_review_id:
             raise serializers.ValidationError({
-                'cafe_id': f'You have already reviewed this cafe. Use PATCH /api/reviews/{existing_review.id}/ to update your review.'
+                'cafe_id': f'You have already reviewed this cafe. Use PATCH /api/reviews/{cafe.existing_review_id}/ to update your review.'
             })
 
-        # Check spam
-        temp_review = Review(
-            user=request.user,
-            cafe=cafe
-        )
-        is_spam, reason = temp_review.check_spam()
+        # Check spam (account age was already checked above)
+        is_spam, reason = Review.check_user_spam(request.user, can_review=True)
         if is_spam:
             raise serializers.ValidationError({
                 'non_field_errors': [f'Review blocked: {reason}']
@@ -398,8 +413,9 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def create(self, validated_data):
         """
-        Create review with user and cafe, and update stats atomically.
-        Uses @transaction.atomic to ensure review creation and stats updates succeed together.
+        Create review with user and cafe, then refresh stats.
+        Stats are recomputed once the review commits, so the aggregate queries
+        don't hold the write transaction open.
         """
         cafe = validated_data.pop('cafe_id')
         validated_data['user'] = self.context['request'].user
@@ -407,9 +423,9 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
 
         review = super().create(validated_data)
 
-        # Update cafe and user stats
-        cafe.update_stats()
-        self.context['request'].user.update_stats()
+        # Update cafe and user stats after commit
+        transaction.on_commit(cafe.update_stats)
+        transaction.on_commit(self.context['request'].user.update_stats)
 
         return review
 
@@ -449,27 +465,45 @@ class ReviewFlagSerializer(serializers.ModelSerializer):
     def validate_review_id(self, value):
         """Validate that user hasn't already flagged this review."""
         request = self.context.get('request')
-        
-        try:
-            review = Review.objects.get(id=value)
-        except Review.DoesNotExist:
+
+        # One query: the review's author plus whether this user already flagged it
+        # (ReviewFlag.save() only needs review_id, so the rest stays deferred)
+        review = Review.objects.filter(id=value).annotate(
+            already_flagged=Exists(
+                ReviewFlag.objects.filter(review=OuterRef('pk'), flagged_by=request.user)
+            )
+        ).only('id', 'user').first()
+
+        if review is None:
             raise serializers.ValidationError("Review not found.")
-        
-        if ReviewFlag.objects.filter(review=review, flagged_by=request.user).exists():
+
+        if review.already_flagged:
             raise serializers.ValidationError("You have already flagged this review.")
-        
+
         # Can't flag own reviews
-        if review.user == request.user:
+        if review.user_id == request.user.pk:
             raise serializers.ValidationError("You cannot flag your own review.")
         
         return review
     
     def create(self, validated_data):
-        """Create flag with current user."""
+        """
+        Create flag with current user.
+
+        A concurrent duplicate that slipped past validate_review_id() is
+        rejected by the unique (review, flagged_by) constraint.
+        """
         review = validated_data.pop('review_id')
         validated_data['review'] = review
         validated_data['flagged_by'] = self.context['request'].user
-        return super().create(validated_data)
+
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                'review_id': ['You have already flagged this review.']
+            })
 
 
 class CombinedVisitReviewSerializer(serializers.Serializer):
@@ -509,15 +543,15 @@ class CombinedVisitReviewSerializer(serializers.Serializer):
         required=False,
         allow_null=True
     )
-    check_in_latitude = serializers.DecimalField(
-        max_digits=10,
-        decimal_places=8,
+    check_in_latitude = serializers.FloatField(
+        min_value=-90,
+        max_value=90,
         required=False,
         allow_null=True
     )
-    check_in_longitude = serializers.DecimalField(
-        max_digits=11,
-        decimal_places=8,
+    check_in_longitude = serializers.FloatField(
+        min_value=-180,
+        max_value=180,
         required=False,
         allow_null=True
     )
@@ -568,14 +602,11 @@ class CombinedVisitReviewSerializer(serializers.Serializer):
     )
 
     def validate(self, data):
-        from apps.cafes.models import Cafe
-
         # Validate that either cafe_id or google_place_id is provided
-        cafe = None
         if 'cafe_id' in data:
-            # Scenario 1: Registered cafe
+            # Scenario 1: Registered cafe (kept for create() so it isn't fetched twice)
             try:
-                cafe = Cafe.objects.get(id=data['cafe_id'], is_closed=False)
+                data['cafe'] = Cafe.objects.get(id=data['cafe_id'], is_closed=False)
             except Cafe.DoesNotExist:
                 raise serializers.ValidationError({
                     'cafe_id': 'Cafe not found or is closed.'
@@ -590,8 +621,6 @@ class CombinedVisitReviewSerializer(serializers.Serializer):
                         f'Missing required fields for new cafe: {", ".join(missing_fields)}'
                     ]
                 })
-            # Check if cafe already exists with this google_place_id
-            cafe = Cafe.objects.filter(google_place_id=data['google_place_id']).first()
         else:
             raise serializers.ValidationError({
                 'non_field_errors': [
@@ -599,18 +628,8 @@ class CombinedVisitReviewSerializer(serializers.Serializer):
                 ]
             })
 
-        # Check for duplicate visit (same user, cafe, date)
-        if cafe and data.get('visit_date'):
-            user = self.context['request'].user
-            existing_visit = Visit.objects.filter(
-                user=user,
-                cafe=cafe,
-                visit_date=data['visit_date']
-            ).exists()
-            if existing_visit:
-                raise serializers.ValidationError({
-                    'visit_date': 'You have already logged a visit to this cafe on this date.'
-                })
+        # Duplicate (user, cafe, visit_date) visits are rejected by the
+        # unique constraint in create()
 
         if data.get('include_review', False):
             if not data.get('wfc_rating'):
@@ -619,14 +638,14 @@ class CombinedVisitReviewSerializer(serializers.Serializer):
                 })
         return data
 
-    @transaction.atomic
     def create(self, validated_data):
         """
         Create visit and optional review in a single atomic transaction.
         If any step fails, all changes are rolled back to maintain data integrity.
-        """
-        from apps.cafes.models import Cafe
 
+        The cafe is resolved first, outside the transaction, so a Google Places
+        lookup for a new cafe doesn't hold it open across network I/O.
+        """
         request = self.context['request']
         user = request.user
         include_review = validated_data.pop('include_review', False)
@@ -643,15 +662,14 @@ class CombinedVisitReviewSerializer(serializers.Serializer):
 
         # Handle cafe - either get existing or create new
         if 'cafe_id' in validated_data:
-            cafe = Cafe.objects.get(id=validated_data.pop('cafe_id'))
+            validated_data.pop('cafe_id')
+            cafe = validated_data.pop('cafe')
         else:
             # Create cafe from Google Places data
             google_place_id = validated_data.pop('google_place_id')
 
             # Use CafeService to get or create cafe with complete Google data
             # This fixes the bug where Google rating fields were missing
-            from apps.cafes.services import CafeService
-
             cafe_data = {
                 'name': validated_data.pop('cafe_name'),
                 'address': validated_data.pop('cafe_address'),
@@ -668,45 +686,48 @@ class CombinedVisitReviewSerializer(serializers.Serializer):
         validated_data['cafe'] = cafe
         validated_data['user'] = user
 
-        visit = Visit.objects.create(**validated_data)
-
-        review = None
-        message = None
-
-        if include_review and review_data.get('wfc_rating'):
-            # Check if user already has a review for this cafe
-            existing_review = Review.objects.filter(
-                user=user,
-                cafe=cafe
-            ).first()
-
-            if existing_review:
-                # User already has a review - don't create duplicate
-                review = existing_review
-                message = 'Visit created. You already have a review for this cafe.'
-            else:
-                # Create new review
-                # Copy visit_time from Visit to Review for backward compatibility
-                review_data['visit_time'] = visit.visit_time
-
-                wfc_rating = review_data['wfc_rating']
-                review_data.setdefault('wifi_quality', review_data.get('wifi_quality', wfc_rating))
-                review_data.setdefault('power_outlets_rating', review_data.get('power_outlets_rating', wfc_rating))
-                review_data.setdefault('seating_comfort', review_data.get('seating_comfort', wfc_rating))
-                review_data.setdefault('noise_level', review_data.get('noise_level', wfc_rating))
-                review_data.setdefault('space_availability', wfc_rating)
-                review_data.setdefault('coffee_quality', wfc_rating)
-                review_data.setdefault('menu_options', wfc_rating)
-                review_data.setdefault('bathroom_quality', wfc_rating)
-
-                review = Review.objects.create(
-                    user=user,
-                    cafe=cafe,
-                    **review_data
-                )
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    visit = Visit.objects.create(**validated_data)
+            except IntegrityError:
+                raise serializers.ValidationError({
+                    'visit_date': ['You have already logged a visit to this cafe on this date.']
+                })
 
-                cafe.update_stats()
-                user.update_stats()
+            review = None
+            message = None
+
+            if include_review and review_data.get('wfc_rating'):
+                # Check if user already has a review for this cafe
+                existing_review = Review.objects.filter(
+                    user=user,
+                    cafe=cafe
+                ).first()
+
+                if existing_review:
+                    # User already has a review - don't create duplicate
+                    review = existing_review
+                    message = 'Visit created. You already have a review for this cafe.'
+                else:
+                    # Create new review
+                    # Copy visit_time from Visit to Review for backward compatibility
+                    review_data['visit_time'] = visit.visit_time
+
+                    # Criteria the user didn't rate default to the overall WFC rating
+                    review_data = {
+                        **dict.fromkeys(_DEFAULTED_CRITERIA, review_data['wfc_rating']),
+                        **review_data
+                    }
+
+                    review = Review.objects.create(
+                        user=user,
+                        cafe=cafe,
+                        **review_data
+                    )
+
+                    transaction.on_commit(cafe.update_stats)
+                    transaction.on_commit(user.update_stats)
 
         return {
             'visit': visit,
@@ -3,52 +3,97 @@ Signal handlers for Review and Visit models.
 Handles stats updates when visits/reviews are deleted.
 """
 import logging
+import threading
 from django.db import transaction
 from django.db.models.signals import post_delete
+from django.contrib.auth import get_user_model
 from django.dispatch import receiver
+from apps.cafes.models import Cafe
 from .models import Visit, Review
 
+User = get_user_model()
+
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_delete, sender=Visit)
-@transaction.atomic
-def update_stats_after_visit_deletion(sender, instance, **kwargs):
+# Per-thread batches of pending stats refreshes, keyed by connection alias
+_pending_refreshes = threading.local()
+
+
+class _PendingStatsRefresh:
     """
-    Update cafe and user stats after a visit is deleted.
-    This fires after the visit (and its cascaded review if any) is deleted.
-    Uses @transaction.atomic to ensure both cafe and user stats are updated together.
+    on_commit callback recomputing stats once for every cafe/user queued by
+    deletes in the same transaction.
     """
-    try:
-        # Update cafe stats (total_visits, unique_visitors, total_reviews, average_wfc_rating)
-        instance.cafe.update_stats()
 
-        # Update user stats (total_visits, total_reviews)
-        instance.user.update_stats()
-    except Exception as e:
-        # Log error but don't raise to avoid blocking deletion
-        logger.error(f"Error updating stats after visit deletion: {e}", exc_info=True)
+    def __init__(self, connection):
+        self.alias = connection.alias
+        # Django swaps in a fresh hook list when a transaction commits or
+        # rolls back (savepoints included), so this ties the batch to the
+        # transaction it was started in
+        self.hooks = connection.run_on_commit
+        self.cafe_ids = set()
+        self.user_ids = set()
 
+    def __call__(self):
+        batches = _pending_refreshes.__dict__.get('batches', {})
+        if batches.get(self.alias) is self:
+            del batches[self.alias]
 
-@receiver(post_delete, sender=Review)
-@transaction.atomic
-def update_stats_after_review_deletion(sender, instance, **kwargs):
+        try:
+            # Rows deleted along with the visit/review (a removed account or
+            # cafe) simply aren't found here and are skipped
+            if self.cafe_ids:
+                Cafe.bulk_update_stats(Cafe.objects.filter(pk__in=self.cafe_ids))
+            for user in User.objects.filter(pk__in=self.user_ids):
+                user.update_stats()
+        except Exception as e:
+            # Log error but don't raise - the delete has already committed
+            logger.error(f"Error updating stats after deletion: {e}", exc_info=True)
+
+
+def _refresh_stats_on_commit(instance):
     """
-    Update cafe and user stats after a review is deleted independently.
-    This only fires when a review is deleted WITHOUT deleting the visit.
-    Uses @transaction.atomic to ensure both cafe and user stats are updated together.
+    Recompute the cafe and user stats affected by a deleted visit/review
+    once the delete commits, so the aggregate queries don't run inside the
+    delete transaction.
+
+    Only the cafe_id/user_id columns are read, so the handler never loads
+    the related rows. IDs are batched per transaction with a single
+    on_commit callback, so deleting many rows of one cafe recomputes it
+    once. A batch left behind by a rolled-back transaction no longer
+    matches the connection's hook list and is replaced, not reused.
     """
-    try:
-        # Get the visit (if it still exists)
-        # The visit might be deleted too (cascade), in which case this won't run
-        if instance.visit_id:
-            visit = instance.visit
-
-            # Update cafe stats (total_reviews, average_wfc_rating)
-            visit.cafe.update_stats()
-
-            # Update user stats (total_reviews)
-            visit.user.update_stats()
-    except Exception as e:
-        # Log error but don't raise to avoid blocking deletion
-        logger.error(f"Error updating stats after review deletion: {e}", exc_info=True)
+    connection = transaction.get_connection()
+
+    if not connection.in_atomic_block:
+        # Autocommit: the delete is already committed, refresh right away
+        batch = _PendingStatsRefresh(connection)
+        batch.cafe_ids.add(instance.cafe_id)
+        batch.user_ids.add(instance.user_id)
+        batch()
+        return
+
+    batches = _pending_refreshes.__dict__.setdefault('batches', {})
+    batch = batches.get(connection.alias)
+    is_new = batch is None or batch.hooks is not connection.run_on_commit
+    if is_new:
+        batch = batches[connection.alias] = _PendingStatsRefresh(connection)
+
+    batch.cafe_ids.add(instance.cafe_id)
+    batch.user_ids.add(instance.user_id)
+
+    if is_new:
+        transaction.on_commit(batch)
+
+
+@receiver(post_delete, sender=Visit)
+def update_stats_after_visit_deletion(sender, instance, **kwargs):
+    """Update cafe stats (visits, visitors) and user stats after a visit is deleted."""
+    _refresh_stats_on_commit(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_stats_after_review_deletion(sender, instance, **kwargs):
+    """Update cafe stats (reviews, ratings) and user stats after a review is deleted."""
+    _refresh_stats_on_commit(instance)
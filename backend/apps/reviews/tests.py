@@ -4,49 +4,37 @@ Visit and Review Tests
 import pytest
 from datetime import date, timedelta
 from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+from django.contrib import admin
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIClient
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIRequestFactory
 from rest_framework import status
 from apps.cafes.models import Cafe
-from apps.reviews.models import Visit, Review
+from apps.core.constants import REVIEW_AUTO_HIDE_FLAG_THRESHOLD
+from apps.reviews.models import Visit, Review, ReviewFlag, ReviewHelpful
+from apps.reviews.serializers import ReviewFlagSerializer, VisitUpdateSerializer
 
 User = get_user_model()
 
 
-@pytest.fixture
-def api_client():
-    """Create API client for tests"""
-    return APIClient()
-
-
-@pytest.fixture
-def test_user(db):
-    """Create a test user"""
-    return User.objects.create_user(
-        username='testuser',
-        email='test@example.com',
-        password='testpass123'
-    )
-
-
-@pytest.fixture
-def test_cafe(db, test_user):
-    """Create a test cafe"""
-    return Cafe.objects.create(
-        name='Test Cafe',
-        address='123 Test St, Jakarta',
-        latitude=Decimal('-6.2088'),
-        longitude=Decimal('106.8456'),
-        google_place_id='test_place_123',
-        created_by=test_user
-    )
-
-
-@pytest.fixture
-def authenticated_client(api_client, test_user):
-    """Create authenticated API client"""
-    api_client.force_authenticate(user=test_user)
-    return api_client
+def create_review(cafe, user, **fields):
+    """Create a review with every required rating filled in"""
+    ratings = {
+        'wfc_rating': 4,
+        'wifi_quality': 4,
+        'power_outlets_rating': 4,
+        'seating_comfort': 4,
+        'noise_level': 3,
+        'space_availability': 4,
+        'coffee_quality': 4,
+        'menu_options': 4,
+    }
+    return Review.objects.create(cafe=cafe, user=user, **{**ratings, **fields})
 
 
 @pytest.mark.django_db
@@ -123,6 +111,21 @@ class TestVisitCreation:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'visit_date' in response.data
 
+    def test_visit_endpoint_rejects_duplicate_via_constraint(self, authenticated_client, test_cafe, test_user):
+        """Test the plain visit endpoint turns a duplicate-visit IntegrityError into a 400"""
+        Visit.objects.create(cafe=test_cafe, user=test_user, visit_date=date.today())
+
+        response = authenticated_client.post('/api/visits/', {
+            'cafe_id': test_cafe.id,
+            'visit_date': str(date.today()),
+            'check_in_latitude': -6.2088,
+            'check_in_longitude': 106.8456,
+        })
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'already logged a visit' in str(response.data)
+        assert Visit.objects.filter(cafe=test_cafe, user=test_user).count() == 1
+
     def test_create_visit_unauthenticated(self, api_client, test_cafe):
         """Test unauthenticated user cannot create visit"""
         data = {
@@ -135,6 +138,28 @@ class TestVisitCreation:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+@pytest.mark.django_db
+class TestVisitLocationVerification:
+    """Test Visit.is_verified_location"""
+
+    @pytest.mark.parametrize('check_in, expected', [
+        ((Decimal('-6.2090'), Decimal('106.8460')), True),
+        ((Decimal('-6.2088'), Decimal('106.8600')), False),
+        ((Decimal('-6.9175'), Decimal('107.6191')), False),
+        ((Decimal('0'), Decimal('106.8456')), False),
+        ((None, None), None),
+    ])
+    def test_verification(self, test_cafe, test_user, check_in, expected):
+        """Test nearby, too-far (longitude, latitude, equator) and missing check-ins"""
+        visit = Visit(
+            cafe=test_cafe,
+            user=test_user,
+            check_in_latitude=check_in[0],
+            check_in_longitude=check_in[1]
+        )
+        assert visit.is_verified_location() is expected
+
+
 @pytest.mark.django_db
 class TestCombinedVisitReview:
     """Test combined visit + review creation"""
@@ -168,6 +193,26 @@ class TestCombinedVisitReview:
         visit = Visit.objects.get(cafe=test_cafe)
         assert Review.objects.filter(cafe=test_cafe, user=visit.user).exists()
 
+    def test_stats_refreshed_after_commit(
+        self, authenticated_client, test_cafe, test_user, django_capture_on_commit_callbacks
+    ):
+        """Test cafe and user stats are recomputed once the visit + review commit"""
+        data = {
+            'cafe_id': test_cafe.id,
+            'visit_date': str(date.today()),
+            'include_review': True,
+            'wfc_rating': 4,
+        }
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            response = authenticated_client.post('/api/visits/create-with-review/', data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(callbacks) >= 2
+        test_cafe.refresh_from_db()
+        test_user.refresh_from_db()
+        assert test_cafe.total_reviews == 1
+        assert test_user.total_reviews == 1
+
     def test_create_visit_without_review(self, authenticated_client, test_cafe):
         """Test creating visit only (no review)"""
         data = {
@@ -238,6 +283,68 @@ class TestUnregisteredCafeAutoRegistration:
         assert Visit.objects.filter(cafe=cafe).exists()
 
 
+@pytest.mark.django_db
+class TestReviewCreation:
+    """Test standalone review creation"""
+
+    @pytest.fixture(autouse=True)
+    def established_user(self, test_user):
+        """Age the account past the review cutoff and reset rate limits"""
+        cache.clear()
+        test_user.date_joined = test_user.date_joined - timedelta(days=2)
+        test_user.save(update_fields=['date_joined'])
+
+    def review_data(self, cafe):
+        return {
+            'cafe_id': cafe.id,
+            'wfc_rating': 4,
+            'wifi_quality': 4,
+            'power_outlets_rating': 4,
+            'seating_comfort': 4,
+            'noise_level': 3,
+            'space_availability': 4,
+            'coffee_quality': 4,
+            'menu_options': 4,
+        }
+
+    def test_second_review_of_cafe_rejected(self, authenticated_client, test_cafe, test_user):
+        """Test a second review of the same cafe points at the existing one"""
+        response = authenticated_client.post('/api/reviews/create/', self.review_data(test_cafe))
+        assert response.status_code == status.HTTP_201_CREATED
+
+        existing = Review.objects.get(user=test_user, cafe=test_cafe)
+        response = authenticated_client.post('/api/reviews/create/', self.review_data(test_cafe))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert f'/api/reviews/{existing.id}/' in str(response.data)
+        assert Review.objects.filter(user=test_user, cafe=test_cafe).count() == 1
+
+
+@pytest.mark.django_db
+class TestVisitList:
+    """Test visit list endpoint"""
+
+    def test_list_visits_fixed_queries(self, authenticated_client, test_cafe, test_user, django_assert_num_queries):
+        """Test nested cafe/user are joined rather than loaded per visit"""
+        for i in range(3):
+            Visit.objects.create(
+                cafe=test_cafe,
+                user=test_user,
+                visit_date=date.today() - timedelta(days=i)
+            )
+
+        # count, visits joined to cafe + user
+        with django_assert_num_queries(2):
+            response = authenticated_client.get('/api/visits/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [v['cafe']['id'] for v in response.data['results']] == [test_cafe.id] * 3
+
+        visit = Visit.objects.with_cafe().list_fields().first()
+        assert {'check_in_latitude', 'check_in_longitude'} <= visit.get_deferred_fields()
+        assert 'password' in visit.user.get_deferred_fields()
+
+
 @pytest.mark.django_db
 class TestVisitEditing:
     """Test visit editing functionality"""
@@ -258,10 +365,28 @@ class TestVisitEditing:
         response = authenticated_client.patch(f'/api/visits/{visit.id}/', data)
 
         assert response.status_code == status.HTTP_200_OK
+        assert response.data['cafe']['id'] == test_cafe.id
         visit.refresh_from_db()
         assert visit.amount_spent == Decimal('15.00')
         assert visit.visit_time == 3
 
+    def test_update_writes_only_submitted_fields(self, test_cafe, test_user):
+        """Test a visit edit doesn't write back columns it didn't change"""
+        visit = Visit.objects.create(
+            cafe=test_cafe,
+            user=test_user,
+            visit_date=date.today(),
+            amount_spent=Decimal('10.00')
+        )
+        # Row changes underneath the loaded instance
+        Visit.objects.filter(pk=visit.pk).update(currency='IDR')
+
+        VisitUpdateSerializer().update(visit, {'amount_spent': Decimal('15.00')})
+
+        visit.refresh_from_db()
+        assert visit.amount_spent == Decimal('15.00')
+        assert visit.currency == 'IDR'
+
     def test_update_visit_after_7_days(self, authenticated_client, test_cafe, test_user):
         """Test updating visit after 7 days should fail"""
         visit = Visit.objects.create(
@@ -354,6 +479,110 @@ class TestReviewModeration:
         review.refresh_from_db()
         assert review.flag_count == 1
 
+    def test_flag_validation_single_query(self, test_cafe, test_user, django_assert_num_queries):
+        """Test flag validation loads the review and duplicate/own-review checks in one query"""
+        review = create_review(test_cafe, test_user)
+        flagger = User.objects.create_user(username='flagger', password='pass123')
+
+        def validate(user):
+            request = APIRequestFactory().post('/api/reviews/flags/')
+            request.user = user
+            return ReviewFlagSerializer(context={'request': request}).validate_review_id(review.id)
+
+        with django_assert_num_queries(1):
+            assert validate(flagger).pk == review.pk
+
+        ReviewFlag.objects.create(review=review, flagged_by=flagger, reason='spam')
+        with pytest.raises(ValidationError, match='already flagged'):
+            validate(flagger)
+        with pytest.raises(ValidationError, match='your own review'):
+            validate(test_user)
+
+    def test_concurrent_duplicate_flag_rejected(self, test_cafe, test_user):
+        """Test a duplicate flag that passed validation is rejected by the unique constraint"""
+        review = create_review(test_cafe, test_user)
+        flagger = User.objects.create_user(username='flagger', password='pass123')
+        request = APIRequestFactory().post('/api/reviews/flags/')
+        request.user = flagger
+
+        serializer = ReviewFlagSerializer(
+            data={'review_id': review.id, 'reason': 'spam'},
+            context={'request': request}
+        )
+        assert serializer.is_valid(), serializer.errors
+        # Another request flags the review between validation and insert
+        ReviewFlag.objects.create(review=review, flagged_by=flagger, reason='spam')
+
+        with pytest.raises(ValidationError, match='already flagged'):
+            serializer.save()
+
+        review.refresh_from_db()
+        assert review.flag_count == 1
+
+    def test_flag_threshold_auto_hides_review(self, test_cafe, test_user):
+        """Test a review is hidden once it reaches the flag threshold"""
+        review = create_review(test_cafe, test_user)
+
+        for i in range(REVIEW_AUTO_HIDE_FLAG_THRESHOLD):
+            review.refresh_from_db()
+            assert not review.is_hidden
+
+            flagger = User.objects.create_user(username=f'flagger{i}', password='pass123')
+            ReviewFlag.objects.create(review=review, flagged_by=flagger, reason='spam')
+
+        review.refresh_from_db()
+        assert review.flag_count == REVIEW_AUTO_HIDE_FLAG_THRESHOLD
+        assert review.is_hidden
+        assert review.is_flagged
+
+    def test_resync_review_counters(self, test_cafe, test_user):
+        """Test resync_review_counters repairs drifted helpful/flag counts"""
+        review = create_review(test_cafe, test_user)
+        other = User.objects.create_user(username='other', password='pass123')
+        ReviewHelpful.objects.create(review=review, user=other)
+        ReviewFlag.objects.create(review=review, flagged_by=other, reason='spam')
+        Review.objects.filter(pk=review.pk).update(helpful_count=7, flag_count=0)
+
+        call_command('resync_review_counters', stdout=StringIO())
+
+        review.refresh_from_db()
+        assert review.helpful_count == 1
+        assert review.flag_count == 1
+
+    def test_resync_keeps_moderator_unhide(self, test_cafe, test_user):
+        """Test resync does not re-hide a review a moderator un-hid"""
+        review = create_review(test_cafe, test_user)
+        for i in range(REVIEW_AUTO_HIDE_FLAG_THRESHOLD):
+            flagger = User.objects.create_user(username=f'flagger{i}', password='pass123')
+            ReviewFlag.objects.create(review=review, flagged_by=flagger, reason='spam')
+        review.refresh_from_db()
+        assert review.is_hidden is True
+
+        # Moderator un-hides; a helpful vote then drifts the other counter
+        Review.objects.filter(pk=review.pk).update(is_hidden=False, is_flagged=False)
+        ReviewHelpful.objects.create(review=review, user=test_user)
+        Review.objects.filter(pk=review.pk).update(helpful_count=0)
+
+        call_command('resync_review_counters', stdout=StringIO())
+
+        review.refresh_from_db()
+        assert review.helpful_count == 1
+        assert review.is_hidden is False
+
+    def test_dismiss_flags_recounts_flag_count(self, test_cafe, test_user):
+        """Test dismissing flags in the admin keeps flag_count in step"""
+        review = create_review(test_cafe, test_user)
+        for i in range(2):
+            flagger = User.objects.create_user(username=f'flagger{i}', password='pass123')
+            ReviewFlag.objects.create(review=review, flagged_by=flagger, reason='spam')
+
+        flag_admin = admin.site._registry[ReviewFlag]
+        with patch.object(flag_admin, 'message_user'):
+            flag_admin.dismiss_flags(None, ReviewFlag.objects.filter(flagged_by__username='flagger0'))
+
+        review.refresh_from_db()
+        assert review.flag_count == 1
+
     def test_mark_review_helpful(self, authenticated_client, test_cafe, db):
         """Test marking a review as helpful"""
         # Create review author (different from authenticated user)
@@ -387,15 +616,184 @@ class TestReviewModeration:
         response = authenticated_client.post(f'/api/reviews/{review.id}/mark_helpful/')
 
         assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['helpful_count'] == 1
         review.refresh_from_db()
         assert review.helpful_count == 1
 
         # Toggle off
         response = authenticated_client.post(f'/api/reviews/{review.id}/mark_helpful/')
         assert response.status_code == status.HTTP_200_OK
+        assert response.data['helpful_count'] == 0
         review.refresh_from_db()
         assert review.helpful_count == 0
 
+    def test_display_data_loads_reviews_in_fixed_queries(self, test_cafe, test_user, django_assert_num_queries):
+        """Test with_display_data() loads user, cafe and the viewer's marks in one query"""
+        for i in range(3):
+            author = User.objects.create_user(username=f'author{i}', password='pass123')
+            review = create_review(test_cafe, author)
+            if i == 0:
+                ReviewHelpful.objects.create(review=review, user=test_user)
+
+        # reviews joined to user + cafe, with the viewer's marks annotated
+        with django_assert_num_queries(1):
+            reviews = list(Review.objects.with_display_data(test_user))
+            rendered = [(r.user.username, r.cafe.name, r.user_marked_helpful, r.user_flagged) for r in reviews]
+
+        assert len(rendered) == 3
+        assert sum(helpful for _, _, helpful, _ in rendered) == 1
+
+    def test_review_list_loads_only_list_fields(self, authenticated_client, test_cafe, django_assert_num_queries):
+        """Test the public review list defers unused columns without triggering per-row loads"""
+        for i in range(3):
+            author = User.objects.create_user(username=f'author{i}', password='pass123')
+            create_review(test_cafe, author, comment='Good for work')
+
+        # count, reviews (joined to user + cafe, viewer's marks annotated)
+        with django_assert_num_queries(2):
+            response = authenticated_client.get('/api/reviews/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [r['comment'] for r in response.data['results']] == ['Good for work'] * 3
+        assert response.data['results'][0]['user']['display_name'].startswith('author')
+
+        review = Review.objects.with_display_data().list_fields().first()
+        assert 'password' in review.user.get_deferred_fields()
+        assert 'created_by_id' in review.cafe.get_deferred_fields()
+
+
+@pytest.mark.django_db
+class TestSpamCheck:
+    """Test review spam heuristics"""
+
+    def test_too_many_reviews_today(self, test_cafe, test_user, settings):
+        """Test reviews past the daily limit are reported as spam"""
+        settings.MAX_REVIEWS_PER_DAY = 0
+        review = create_review(test_cafe, test_user)
+
+        assert review.check_spam() == (True, "Too many reviews in one day")
+
+    def test_uses_annotated_daily_count(self, test_cafe, test_user, django_assert_num_queries):
+        """Test a pre-annotated daily count skips the per-review COUNT query"""
+        review = create_review(test_cafe, test_user)
+        review = Review.objects.select_related('user').get(pk=review.pk)
+        review.user_reviews_today = 1
+
+        with django_assert_num_queries(0):
+            assert review.check_spam() == (False, "OK")
+
+    def test_check_user_spam_without_review_instance(self, test_cafe, test_user, settings, django_assert_num_queries):
+        """Test the user-level check counts today's reviews in one query"""
+        settings.MAX_REVIEWS_PER_DAY = 0
+        create_review(test_cafe, test_user)
+
+        with django_assert_num_queries(1):
+            assert Review.check_user_spam(test_user, can_review=True) == (True, "Too many reviews in one day")
+        assert Review.check_user_spam(test_user, can_review=False) == (True, "Account too new")
+
+    def test_daily_limit_sees_writes_from_other_paths(self, test_cafe, test_user, settings):
+        """Test the daily limit holds for reviews written without this process's signals"""
+        settings.MAX_REVIEWS_PER_DAY = 1
+        review = create_review(test_cafe, test_user)
+        review = Review.objects.select_related('user').get(pk=review.pk)
+        assert review.check_spam() == (False, "OK")
+
+        other_cafe = Cafe.objects.create(
+            name='Other Cafe',
+            address='456 Test St, Jakarta',
+            latitude=Decimal('-6.2100'),
+            longitude=Decimal('106.8500'),
+            created_by=test_user
+        )
+        # bulk_create skips save() and its signals, like a write handled
+        # by another worker
+        Review.objects.bulk_create([
+            Review(
+                cafe=other_cafe,
+                user=test_user,
+                wfc_rating=4,
+                wifi_quality=4,
+                seating_comfort=4,
+                noise_level=3,
+                space_availability=4,
+                coffee_quality=4,
+                menu_options=4
+            )
+        ])
+
+        assert review.check_spam() == (True, "Too many reviews in one day")
+
+    def test_new_account_matches_annotated_cutoff(self, test_cafe, test_user, settings):
+        """Test the SQL account-age cutoff agrees with User.can_review()"""
+        settings.MAX_REVIEWS_PER_DAY = 10
+        settings.MIN_ACCOUNT_AGE_HOURS = 24
+        review = create_review(test_cafe, test_user)
+        annotated = Review.objects.filter(
+            pk=review.pk,
+            user__date_joined__lte=User.review_cutoff()
+        ).exists()
+
+        assert annotated is test_user.can_review() is False
+        assert review.check_spam() == (True, "Account too new")
+
+
+@pytest.mark.django_db
+class TestAverageRating:
+    """Test the per-review average of rated criteria"""
+
+    def test_average_skips_unrated_and_refreshes_on_save(self, test_cafe, test_user):
+        """Test optional criteria are skipped and the stored value refreshes on save"""
+        review = Review.objects.create(
+            cafe=test_cafe,
+            user=test_user,
+            wfc_rating=5,
+            wifi_quality=5,
+            seating_comfort=5,
+            noise_level=5,
+            space_availability=5,
+            coffee_quality=5,
+            menu_options=5
+        )
+        assert review.average_rating == 5
+
+        review.wifi_quality = 1
+        review.save()
+
+        assert review.average_rating == pytest.approx(31 / 7)
+
+    def test_average_stored_for_sorting(self, test_cafe, test_user):
+        """Test the average is persisted so queries can filter and sort on it"""
+        review = Review.objects.create(
+            cafe=test_cafe,
+            user=test_user,
+            wfc_rating=4,
+            wifi_quality=5,
+            power_outlets_rating=2,
+            seating_comfort=3,
+            noise_level=4,
+            space_availability=5,
+            coffee_quality=3,
+            menu_options=4
+        )
+
+        stored = Review.objects.values_list('average_rating_cache', flat=True).get(pk=review.pk)
+        assert stored == pytest.approx(30 / 8)
+        assert Review.objects.get(pk=review.pk).average_rating == pytest.approx(30 / 8)
+
+    def test_non_rating_save_skips_average(self, test_cafe, test_user, django_assert_num_queries):
+        """Test a save that touches no rating field doesn't load deferred ratings"""
+        review = create_review(test_cafe, test_user)
+        review = Review.objects.only('id', 'is_hidden').get(pk=review.pk)
+
+        review.is_hidden = True
+        with django_assert_num_queries(1):
+            review.save(update_fields=['is_hidden'])
+
+        review.wifi_quality = 1
+        review.save(update_fields=['wifi_quality'])
+        stored = Review.objects.values_list('average_rating_cache', flat=True).get(pk=review.pk)
+        assert stored == pytest.approx(28 / 8)
+
 
 @pytest.mark.django_db
 class TestCafeStatistics:
@@ -444,3 +842,84 @@ class TestCafeStatistics:
 
         assert test_cafe.total_reviews == initial_reviews + 1
         assert test_cafe.average_wfc_rating is not None
+
+    def test_stats_refreshed_after_review_deletion(self, test_cafe, test_user, django_capture_on_commit_callbacks):
+        """Test deleting a review recomputes cafe and user stats once the delete commits"""
+        review = create_review(test_cafe, test_user)
+        test_cafe.update_stats()
+        test_user.update_stats()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            review.delete()
+            test_cafe.refresh_from_db()
+            assert test_cafe.total_reviews == 1
+
+        test_cafe.refresh_from_db()
+        test_user.refresh_from_db()
+        assert test_cafe.total_reviews == 0
+        assert test_cafe.average_wfc_rating is None
+        assert test_user.total_reviews == 0
+
+    def test_account_deletion_skips_deleted_user_stats(self, test_cafe, test_user, django_capture_on_commit_callbacks):
+        """Test cascaded visit deletes refresh the cafe but not the user being deleted"""
+        Visit.objects.create(cafe=test_cafe, user=test_user, visit_date=date.today())
+        test_cafe.update_stats()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            test_user.delete()
+
+        test_cafe.refresh_from_db()
+        assert test_cafe.total_visits == 0
+
+    def test_bulk_visit_delete_recomputes_cafe_once(self, test_cafe, test_user, django_capture_on_commit_callbacks):
+        """Test deleting many visits of one cafe in a transaction refreshes its stats once"""
+        for i in range(3):
+            Visit.objects.create(cafe=test_cafe, user=test_user, visit_date=date.today() - timedelta(days=i))
+        test_cafe.update_stats()
+
+        with patch.object(Cafe, 'bulk_update_stats', wraps=Cafe.bulk_update_stats) as cafe_refresh:
+            with django_capture_on_commit_callbacks(execute=True):
+                Visit.objects.filter(cafe=test_cafe).delete()
+
+        assert cafe_refresh.call_count == 1
+        test_cafe.refresh_from_db()
+        assert test_cafe.total_visits == 0
+
+    def test_rolled_back_delete_is_not_refreshed(self, test_cafe, test_user, django_capture_on_commit_callbacks):
+        """Test a delete rolled back with its savepoint doesn't queue a stats refresh"""
+        Visit.objects.create(cafe=test_cafe, user=test_user, visit_date=date.today())
+        other_cafe = Cafe.objects.create(
+            name='Other Cafe',
+            address='456 Test St, Jakarta',
+            latitude=Decimal('-6.2100'),
+            longitude=Decimal('106.8500'),
+            created_by=test_user
+        )
+        other_visit = Visit.objects.create(cafe=other_cafe, user=test_user, visit_date=date.today())
+
+        with patch.object(Cafe, 'bulk_update_stats', wraps=Cafe.bulk_update_stats) as cafe_refresh:
+            with django_capture_on_commit_callbacks(execute=True):
+                with pytest.raises(RuntimeError):
+                    with transaction.atomic():
+                        Visit.objects.filter(cafe=test_cafe).delete()
+                        raise RuntimeError
+                other_visit.delete()
+
+        assert cafe_refresh.call_count == 1
+        refreshed_ids = {cafe.pk for cafe in cafe_refresh.call_args.args[0]}
+        assert refreshed_ids == {other_cafe.pk}
+
+    def test_delete_after_rollback_still_refreshed(self, test_cafe, test_user, django_capture_on_commit_callbacks):
+        """Test a cafe queued by a rolled-back delete is refreshed by a later committed delete"""
+        Visit.objects.create(cafe=test_cafe, user=test_user, visit_date=date.today())
+        test_cafe.update_stats()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    Visit.objects.filter(cafe=test_cafe).delete()
+                    raise RuntimeError
+            Visit.objects.filter(cafe=test_cafe).delete()
+
+        test_cafe.refresh_from_db()
+        assert test_cafe.total_visits == 0
@@ -13,6 +13,7 @@ from core.exceptions import (
 from .models import Visit, Review, ReviewHelpful
 from .serializers import (
     VisitSerializer,
+    VisitUpdateSerializer,
     ReviewListSerializer,
     ReviewDetailSerializer,
     ReviewCreateSerializer,
@@ -46,7 +47,7 @@ class VisitListCreateView(generics.ListCreateAPIView):
 
         UPDATED: Removed select_related('review') - reviews are now independent of visits.
         """
-        return Visit.objects.filter(user=self.request.user).select_related('cafe')
+        return Visit.objects.filter(user=self.request.user).with_cafe().list_fields()
 
 
 class VisitDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -57,11 +58,15 @@ class VisitDetailView(generics.RetrieveUpdateDestroyAPIView):
     PATCH /api/visits/{id}/
     DELETE /api/visits/{id}/
     """
-    serializer_class = VisitSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Visit.objects.filter(user=self.request.user)
+        return Visit.objects.filter(user=self.request.user).with_cafe()
+
+    def get_serializer_class(self):
+        if self.request.method in ['PUT', 'PATCH']:
+            return VisitUpdateSerializer
+        return VisitSerializer
 
 
 class CombinedVisitReviewCreateView(generics.CreateAPIView):
@@ -129,31 +134,7 @@ class ReviewListView(generics.ListAPIView):
 
         UPDATED: Removed select_related('visit') - reviews are now independent of visits.
         """
-        from django.db.models import Prefetch
-        from .models import ReviewHelpful, ReviewFlag
-
-        queryset = Review.objects.filter(is_hidden=False).select_related(
-            'user',
-            'cafe'
-        )
-
-        # Prefetch user-specific helpful/flag data if user is authenticated
-        request = self.request
-        if request and request.user.is_authenticated:
-            queryset = queryset.prefetch_related(
-                Prefetch(
-                    'helpful_marks',
-                    queryset=ReviewHelpful.objects.filter(user=request.user),
-                    to_attr='user_helpful'
-                ),
-                Prefetch(
-                    'flags',
-                    queryset=ReviewFlag.objects.filter(flagged_by=request.user),
-                    to_attr='user_flags'
-                )
-            )
-
-        return queryset
+        return Review.objects.filter(is_hidden=False).with_display_data(self.request.user).list_fields()
 
 
 @method_decorator(ratelimit(key='user', rate='10/h', method='POST'), name='post')
@@ -188,9 +169,12 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
     - UPDATE: Only allowed within 7 days of visit date
     - DELETE: Allowed at any time (no time restrictions)
     """
-    queryset = Review.objects.filter(is_hidden=False)
     permission_classes = [IsOwnerOrReadOnly]
 
+    def get_queryset(self):
+        """Join the nested user/cafe and annotate the viewer's helpful mark."""
+        return Review.objects.filter(is_hidden=False).with_display_data(self.request.user)
+
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return ReviewUpdateSerializer
@@ -202,10 +186,10 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
         Update review and refresh cafe stats.
 
         UPDATED: No time restrictions - users can edit their review anytime.
-        Uses @transaction.atomic to ensure review update and stats update succeed together.
+        Cafe stats are recomputed once the update commits.
         """
         review = serializer.save()
-        review.cafe.update_stats()
+        transaction.on_commit(review.cafe.update_stats)
 
     @transaction.atomic
     def perform_destroy(self, instance):
@@ -235,7 +219,7 @@ class MyReviewsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Review.objects.filter(user=self.request.user)
+        return Review.objects.filter(user=self.request.user).with_display_data(self.request.user)
 
 
 class CafeReviewsView(generics.ListAPIView):
@@ -256,35 +240,11 @@ class CafeReviewsView(generics.ListAPIView):
 
         UPDATED: Removed select_related('visit') - reviews are now independent of visits.
         """
-        from django.db.models import Prefetch
-        from .models import ReviewHelpful, ReviewFlag
-
         cafe_id = self.kwargs.get('cafe_id')
-        queryset = Review.objects.filter(
+        return Review.objects.filter(
             cafe_id=cafe_id,
             is_hidden=False
-        ).select_related(
-            'user',
-            'cafe'
-        )
-
-        # Prefetch user-specific helpful/flag data if user is authenticated
-        request = self.request
-        if request and request.user.is_authenticated:
-            queryset = queryset.prefetch_related(
-                Prefetch(
-                    'helpful_marks',
-                    queryset=ReviewHelpful.objects.filter(user=request.user),
-                    to_attr='user_helpful'
-                ),
-                Prefetch(
-                    'flags',
-                    queryset=ReviewFlag.objects.filter(flagged_by=request.user),
-                    to_attr='user_flags'
-                )
-            )
-
-        return queryset
+        ).with_display_data(self.request.user).list_fields()
 
 
 class ReviewFlagCreateView(generics.CreateAPIView):
@@ -328,7 +288,7 @@ class UserCafeReviewView(APIView):
             raise ValidationError({'cafe': 'This parameter is required'})
 
         try:
-            review = Review.objects.get(
+            review = Review.objects.with_display_data(request.user).get(
                 user=request.user,
                 cafe_id=cafe_id,
                 is_hidden=False
@@ -390,7 +350,7 @@ class BulkUserCafeReviewsView(APIView):
             user=request.user,
             cafe_id__in=cafe_ids,
             is_hidden=False
-        ).select_related('cafe', 'user')
+        ).with_display_data(request.user)
 
         # Serialize reviews
         serializer = ReviewDetailSerializer(
@@ -438,6 +398,7 @@ class MarkReviewHelpfulView(APIView):
         if existing:
             # Unmark as helpful
             existing.delete()
+            review.refresh_from_db(fields=['helpful_count'])
             return Response({
                 'message': 'Review unmarked as helpful',
                 'is_helpful': False,
@@ -450,7 +411,7 @@ class MarkReviewHelpfulView(APIView):
                 user=request.user
             )
             # Refresh review to get updated count
-            review.refresh_from_db()
+            review.refresh_from_db(fields=['helpful_count'])
             return Response({
                 'message': 'Review marked as helpful',
                 'is_helpful': True,